@@ -0,0 +1,97 @@
+import requests
+from requests.adapters import HTTPAdapter
+from api.lifecycle import set_read_timeout
+
+DEFAULT_API_BASE = "http://localhost:11434"
+DEFAULT_POOL_SIZE = 4
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_FIRST_BYTE_TIMEOUT = 300
+DEFAULT_IDLE_TIMEOUT = 60
+
+class OllamaClient:
+    def __init__(self, base_url=DEFAULT_API_BASE, pool_size=DEFAULT_POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.connect_timeout = DEFAULT_CONNECT_TIMEOUT
+        self.first_byte_timeout = DEFAULT_FIRST_BYTE_TIMEOUT
+        self.idle_timeout = DEFAULT_IDLE_TIMEOUT
+        self.session = self._build_session(pool_size)
+
+    def _build_session(self, pool_size):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def configure(self, config):
+        self.set_base_url(config.get("api_url", DEFAULT_API_BASE))
+        self.set_pool_size(config.get("pool_size", DEFAULT_POOL_SIZE))
+        self.connect_timeout = config.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT)
+        self.first_byte_timeout = config.get("first_byte_timeout", DEFAULT_FIRST_BYTE_TIMEOUT)
+        self.idle_timeout = config.get("idle_timeout", DEFAULT_IDLE_TIMEOUT)
+
+    def set_base_url(self, base_url):
+        base_url = base_url.rstrip("/")
+        if base_url != self.base_url:
+            self.base_url = base_url
+            self.session.close()
+            self.session = self._build_session(self.pool_size)
+
+    def set_pool_size(self, pool_size):
+        if pool_size != self.pool_size:
+            self.pool_size = pool_size
+            self.session.close()
+            self.session = self._build_session(pool_size)
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def timeouts(self, token=None):
+        connect, first_byte = self.connect_timeout, self.first_byte_timeout
+        if token is not None:
+            token.check()
+            connect, first_byte = token.limit(connect), token.limit(first_byte)
+        return (connect, first_byte)
+
+    def _send(self, method, path, token=None, stream=False, idle=True, **kwargs):
+        response = self.session.request(method, self.url(path), timeout=self.timeouts(token), stream=stream, **kwargs)
+        if stream and not idle:
+            set_read_timeout(response, None)
+        elif stream:
+            set_read_timeout(response, token.limit(self.idle_timeout) if token else self.idle_timeout)
+        if token is not None:
+            token.register(response)
+        return response
+
+    def tags(self, base_url=None, timeout=None):
+        url = f"{base_url.rstrip('/')}/api/tags" if base_url else self.url("/api/tags")
+        return self.session.get(url, timeout=timeout or self.timeouts())
+
+    def list_models(self):
+        try:
+            r = self.tags()
+            if not r.ok:
+                return None
+            return r.json().get("models", [])
+        except Exception:
+            return None
+
+    def chat(self, payload, stream=False, token=None):
+        payload = dict(payload)
+        payload["stream"] = stream
+        return self._send("POST", "/api/chat", token=token, stream=stream, json=payload)
+
+    def show(self, model_name, token=None):
+        return self._send("POST", "/api/show", token=token, json={"model": model_name})
+
+    def pull(self, model_name, token=None):
+        return self._send("POST", "/api/pull", token=token, stream=True, idle=False, json={"model": model_name})
+
+    def delete(self, model_name, token=None):
+        return self._send("DELETE", "/api/delete", token=token, json={"name": model_name})
+
+    def close(self):
+        self.session.close()
+
+client = OllamaClient()
@@ -0,0 +1,117 @@
+import threading
+import time
+
+class Cancelled(Exception):
+    pass
+
+class CancelToken:
+    def __init__(self, timeout=None, parent=None):
+        self.lock = threading.Lock()
+        self.event = threading.Event()
+        self.resources = []
+        self.children = []
+        self.parent = parent
+        self.timer = None
+        self.expires = None
+        if timeout:
+            self.expires = time.monotonic() + timeout
+        if parent is not None:
+            if parent.expires is not None and (self.expires is None or parent.expires < self.expires):
+                self.expires = parent.expires
+            parent._adopt(self)
+        if timeout:
+            self.timer = threading.Timer(timeout, self.cancel)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _adopt(self, child):
+        with self.lock:
+            if not self.event.is_set():
+                self.children.append(child)
+                return
+        child.cancel()
+
+    def child(self, timeout=None):
+        return CancelToken(timeout=timeout, parent=self)
+
+    @property
+    def cancelled(self):
+        if self.event.is_set():
+            return True
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def remaining(self):
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - time.monotonic())
+
+    def limit(self, timeout):
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled()
+
+    def register(self, resource):
+        with self.lock:
+            if not self.event.is_set():
+                self.resources.append(resource)
+                return resource
+        _close_quietly(resource)
+        raise Cancelled()
+
+    def release(self, resource):
+        with self.lock:
+            if resource in self.resources:
+                self.resources.remove(resource)
+        _close_quietly(resource)
+
+    def cancel(self):
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.event.set()
+            resources, self.resources = self.resources, []
+            children, self.children = self.children, []
+        for resource in resources:
+            _close_quietly(resource)
+        for child in children:
+            child.cancel()
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.cancel()
+        if self.parent is not None:
+            with self.parent.lock:
+                if self in self.parent.children:
+                    self.parent.children.remove(self)
+        with self.lock:
+            resources, self.resources = self.resources, []
+        for resource in resources:
+            _close_quietly(resource)
+
+def _close_quietly(resource):
+    try:
+        resource.close()
+    except Exception:
+        pass
+
+def set_read_timeout(response, timeout):
+    try:
+        sock = response.raw._fp.fp.raw._sock
+    except AttributeError:
+        return False
+    sock.settimeout(timeout)
+    return True
@@ -1,23 +1,79 @@
-import json
 import time
-import requests
 import sys
+import requests
 from rich.console import Console
+from api.client import client
+from api.ndjson import NDJSONReader
+from config.settings import save_config
 from ui.display import display_logo, clear_screen
+from utils.aio import executor
 from utils.spinners import FancySpinner
 
 console = Console()
-OLLAMA_API_BASE = "http://localhost:11434"
+CAPABILITIES = {}
+INSTALLED = {}
+MISSING = set()
 
-def select_model():
-    global OLLAMA_API_BASE
-    try:
-        r = requests.get(f"{OLLAMA_API_BASE}/api/tags")
-        if not r.ok:
-            raise Exception("Non-OK response")
-        models = r.json().get("models", [])
-    except Exception:
-        models = None
+def fetch_models():
+    return executor.submit(client.list_models)
+
+def warm_up(model):
+    def load():
+        try:
+            client.chat({"model": model, "messages": []}).close()
+        except Exception:
+            pass
+    return executor.submit(load)
+
+def full_name(model):
+    return model if ":" in model else f"{model}:latest"
+
+def installed_models(refresh=False):
+    if refresh or INSTALLED.get("names") is None:
+        models = client.list_models()
+        if models is None:
+            return None
+        INSTALLED["names"] = {full_name(entry.get("name", "")) for entry in models}
+        INSTALLED["digests"] = {full_name(entry.get("name", "")): entry.get("digest") for entry in models}
+    return INSTALLED["names"]
+
+def model_digest(model):
+    if installed_models() is None:
+        return None
+    return INSTALLED["digests"].get(full_name(model))
+
+def route_model(model, task, config):
+    helper = config.get("helper_model", "").strip()
+    if not helper or task in (None, "answer") or full_name(helper) == full_name(model):
+        return model
+    installed = installed_models()
+    if installed is not None and full_name(helper) not in installed:
+        if helper not in MISSING:
+            MISSING.add(helper)
+            console.print(f"[yellow]Helper model {helper} is not pulled, using {model} for background tasks. Pull it from /change_model with 'p {helper}'.[/yellow]")
+        return model
+    return helper
+
+def supports_tools(model):
+    if model not in CAPABILITIES:
+        try:
+            response = client.show(model)
+            if not response.ok:
+                return False
+            data = response.json()
+        except Exception:
+            return False
+        capabilities = data.get("capabilities")
+        if capabilities is None:
+            CAPABILITIES[model] = ".Tools" in data.get("template", "")
+        else:
+            CAPABILITIES[model] = "tools" in capabilities
+    return CAPABILITIES[model]
+
+def select_model(config, pending=None):
+    if pending is None:
+        pending = fetch_models()
+    models = None
     while True:
         clear_screen()
         display_logo()
@@ -30,6 +86,9 @@ def select_model():
         ''')
         console.print(instructions)
         console.print("Available models:")
+        if pending is not None:
+            models = pending.result()
+            pending = None
         if models is None:
             console.print("  [red]Error connecting to ollama. Is it running?[/red]")
         elif not models:
@@ -45,13 +104,11 @@ def select_model():
             new_api = input().strip()
             if new_api:
                 try:
-                    test_response = requests.get(f"{new_api}/api/tags", timeout=5)
+                    test_response = client.tags(base_url=new_api, timeout=5)
                     if test_response.ok:
-                        OLLAMA_API_BASE = new_api
-                        from main import CONFIG
-                        CONFIG["api_url"] = new_api
-                        from config.settings import save_config
-                        save_config(CONFIG)
+                        client.set_base_url(new_api)
+                        config["api_url"] = new_api
+                        save_config(config)
                         console.print(f"[green]API URL changed to {new_api}[/green]")
                         models = test_response.json().get("models", [])
                     else:
@@ -70,14 +127,7 @@ def select_model():
                 console.print("[green]Please specify a model name to pull. For example: p llama3.2[/green]")
                 continue
             pull_model(model_name)
-            try:
-                r = requests.get(f"{OLLAMA_API_BASE}/api/tags")
-                if r.ok:
-                    models = r.json().get("models", [])
-                else:
-                    models = None
-            except Exception:
-                models = None
+            models = client.list_models()
             continue
         elif choice.lower().startswith("r"):
             model_identifier = choice[1:].strip()
@@ -96,14 +146,7 @@ def select_model():
             except ValueError:
                 remove_model(model_identifier)
                 
-            try:
-                r = requests.get(f"{OLLAMA_API_BASE}/api/tags")
-                if r.ok:
-                    models = r.json().get("models", [])
-                else:
-                    models = None
-            except Exception:
-                models = None
+            models = client.list_models()
             continue
         else:
             try:
@@ -126,15 +169,13 @@ def select_model():
                 selected = choice
             console.print(f"[white]Selected model:[/white] [violet]{selected}[/violet]")
             clear_screen()
-            try:
-                requests.post(f"{OLLAMA_API_BASE}/api/chat", json={"model": selected, "messages": []})
-            except Exception:
-                pass
+            warm_up(selected)
             return selected
 
 def pull_model(model_name):
+    INSTALLED.clear()
     try:
-        response = requests.post(f"{OLLAMA_API_BASE}/api/pull", json={"model": model_name}, stream=True)
+        response = client.pull(model_name)
     except Exception as e:
         console.print(f"[green]Error pulling model[/green] [violet]{model_name}[/violet][green]:[/green] {e}")
         input("Press Enter to continue...")
@@ -144,15 +185,10 @@ def pull_model(model_name):
     spinner.start()
     
     pull_success = False
-    i = 0
+    data = {}
+    reader = NDJSONReader(response)
     try:
-        for line in response.iter_lines(decode_unicode=True):
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-            except Exception:
-                continue
+        for data in reader:
             status = data.get("status", "")
             total = data.get("total")
             completed = data.get("completed")
@@ -163,7 +199,6 @@ def pull_model(model_name):
                 spinner.update(f"Pulling model {model_name} {progress_status} {status}")
             else:
                 spinner.update(f"Pulling model {model_name} {status}")
-            i += 1
         spinner.stop()
         time.sleep(0.5)
         clear_screen()
@@ -174,6 +209,8 @@ def pull_model(model_name):
         else:
             error_text = data.get("error", "Unknown error")
             console.print(f"[green]Error pulling model[/green] [violet]{model_name}[/violet][green]. Response: {error_text}[/green]")
+        if reader.malformed:
+            console.print(f"[yellow]Skipped {reader.malformed} malformed progress frame(s).[/yellow]")
             
         input("Press Enter to continue...")
         return pull_success
@@ -182,10 +219,18 @@ def pull_model(model_name):
         console.print(f"\n[green]Pulling model[/green] [violet]{model_name}[/violet] [green]interrupted.[/green]")
         input("Press Enter to continue...")
         return False
+    except requests.RequestException as e:
+        spinner.stop()
+        console.print(f"\n[green]Error pulling model[/green] [violet]{model_name}[/violet][green]:[/green] {e}")
+        input("Press Enter to continue...")
+        return False
+    finally:
+        response.close()
 
 def remove_model(model_name):
+    INSTALLED.clear()
     try:
-        response = requests.delete(f"{OLLAMA_API_BASE}/api/delete", json={"name": model_name})
+        response = client.delete(model_name)
     except Exception as e:
         console.print(f"[green]Error removing model[/green] [violet]{model_name}[/violet][green]:[/green] {e}")
         input("Press Enter to continue...")
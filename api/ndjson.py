@@ -0,0 +1,64 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+READ_CHUNK_SIZE = 64 * 1024
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+class NDJSONReader:
+    def __init__(self, response, chunk_size=READ_CHUNK_SIZE):
+        self.response = response
+        self.chunk_size = chunk_size
+        self.frames = 0
+        self.malformed = 0
+        self.last_malformed = None
+
+    def _decode(self, line):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            frame = loads(line)
+        except ValueError:
+            self.malformed += 1
+            self.last_malformed = line[:200].decode("utf-8", errors="replace")
+            return None
+        self.frames += 1
+        return frame
+
+    def __iter__(self):
+        parts = []
+        for block in self.response.iter_content(chunk_size=self.chunk_size):
+            if not block:
+                continue
+            if b"\n" not in block:
+                parts.append(block)
+                continue
+            if parts:
+                parts.append(block)
+                block = b"".join(parts)
+                parts = []
+            lines = block.split(b"\n")
+            tail = lines.pop()
+            if tail:
+                parts.append(tail)
+            for line in lines:
+                frame = self._decode(line)
+                if frame is not None:
+                    yield frame
+        if parts:
+            frame = self._decode(b"".join(parts))
+            if frame is not None:
+                yield frame
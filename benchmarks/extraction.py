@@ -0,0 +1,89 @@
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.extract import available_backends, extract_text
+from benchmarks.make_pages import DEFAULT_CORPUS, make_corpus
+
+console = Console()
+
+def soup_baseline(html, max_words):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    for script in soup(["script", "style"]):
+        script.decompose()
+    return " ".join(soup.get_text(separator=" ").split()[:max_words])
+
+def load_corpus(path):
+    pages = []
+    for filename in sorted(glob.glob(os.path.join(path, "**", "*.htm*"), recursive=True)):
+        with open(filename, "rb") as f:
+            pages.append((os.path.basename(filename), f.read().decode("utf-8", errors="replace")))
+    return pages
+
+def time_extractor(extract, pages, max_words, repeats):
+    samples = []
+    words = 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _, html in pages:
+            text = extract(html, max_words)
+            words += len(text.split())
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), words / (repeats * len(pages))
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HTML text extraction backends over a corpus of saved pages.")
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, help="directory of saved .html files (default: pages generated by benchmarks/make_pages.py)")
+    parser.add_argument("--words", type=int, default=500, help="word budget per page (search_amount)")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.corpus == DEFAULT_CORPUS and not os.path.isdir(DEFAULT_CORPUS):
+        console.print(f"[green]Generating the default corpus in {DEFAULT_CORPUS}...[/green]")
+        make_corpus()
+    pages = load_corpus(args.corpus)
+    if not pages:
+        console.print(f"[red]No .html files found in {args.corpus}.[/red] Save a few result pages there, e.g. with curl -o.")
+        return 1
+
+    extractors = []
+    try:
+        import bs4
+        extractors.append(("bs4 html.parser (full text)", soup_baseline))
+    except ImportError:
+        console.print("[yellow]beautifulsoup4 is not installed, skipping the baseline.[/yellow]")
+    for backend in available_backends():
+        extractors.append((f"{backend} (main content)", lambda html, words, backend=backend: extract_text(html, words, backend=backend)))
+        extractors.append((f"{backend} (full text)", lambda html, words, backend=backend: extract_text(html, words, backend=backend, main_content=False)))
+
+    total_bytes = sum(len(html) for _, html in pages)
+    table = Table(title=f"{len(pages)} page(s), {total_bytes / 1024:.0f} KB, {args.words} word budget")
+    table.add_column("Extractor", style="cyan")
+    table.add_column("ms / page", justify="right")
+    table.add_column("MB / s", justify="right")
+    table.add_column("Words / page", justify="right")
+    table.add_column("Speedup", justify="right", style="green")
+    baseline = None
+    for name, extract in extractors:
+        seconds, words = time_extractor(extract, pages, args.words, args.repeats)
+        baseline = baseline or seconds
+        table.add_row(
+            name,
+            f"{seconds * 1000 / len(pages):.2f}",
+            f"{total_bytes / seconds / 1024 / 1024:.1f}",
+            f"{words:.0f}",
+            f"{baseline / seconds:.1f}x"
+        )
+    console.print(table)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
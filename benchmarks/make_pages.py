@@ -0,0 +1,66 @@
+import argparse
+import os
+import random
+import sys
+from rich.console import Console
+
+console = Console()
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+WORDS = (
+    "model server search result page article update release version memory speed local network "
+    "answer question library install python window terminal cache request response token context "
+    "history summary research source reader download browser weather price schedule report data"
+).split()
+
+def sentence(rng, low=8, high=22):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+    return " ".join(words).capitalize() + "."
+
+def paragraph(rng):
+    return " ".join(sentence(rng) for _ in range(rng.randint(3, 7)))
+
+def navigation(rng):
+    links = "".join(f'<li><a href="/{word}">{word.title()}</a></li>' for word in rng.sample(WORDS, 8))
+    return f'<nav class="menu"><ul>{links}</ul></nav>'
+
+def make_page(rng, index):
+    title = sentence(rng, 3, 7).rstrip(".")
+    body = "".join(
+        f"<h2>{sentence(rng, 2, 5).rstrip('.')}</h2><p>{paragraph(rng)}</p>" if section % 3 == 0 else f"<p>{paragraph(rng)}</p>"
+        for section in range(rng.randint(6, 24))
+    )
+    sidebar = "".join(f'<div class="related"><a href="/related/{n}">{sentence(rng, 3, 6)}</a></div>' for n in range(rng.randint(4, 12)))
+    script = "var data = " + repr([rng.random() for _ in range(rng.randint(50, 400))]) + ";"
+    return (
+        f"<!DOCTYPE html><html><head><title>{title}</title>"
+        f"<style>body {{ font-family: sans-serif; }} .menu li {{ display: inline; }}</style>"
+        f"<script>{script}</script></head><body>"
+        f"<header>{navigation(rng)}</header>"
+        f'<div id="cookie-banner">We use cookies to improve your experience. <button>Accept</button></div>'
+        f'<main><article><h1>{title}</h1>{body}</article></main>'
+        f"<aside>{sidebar}</aside>"
+        f"<footer>{navigation(rng)}<p>Copyright page {index}. All rights reserved.</p></footer>"
+        f"</body></html>"
+    )
+
+def make_corpus(path=DEFAULT_CORPUS, count=20, seed=0):
+    rng = random.Random(seed)
+    os.makedirs(path, exist_ok=True)
+    for index in range(count):
+        with open(os.path.join(path, f"page{index:02d}.html"), "w", encoding="utf-8") as f:
+            f.write(make_page(rng, index))
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a reproducible corpus of synthetic result pages for benchmarks/extraction.py.")
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, help="directory to write the .html files to")
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    count = make_corpus(args.corpus, args.count, args.seed)
+    console.print(f"[green]Wrote {count} page(s) to {args.corpus}.[/green]")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
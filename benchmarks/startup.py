@@ -0,0 +1,110 @@
+import argparse
+import os
+import pty
+import select
+import statistics
+import subprocess
+import sys
+import time
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET_MS = 700
+DEFAULT_RUNS = 5
+HELP_LINE = b"to see available commands"
+PROMPT = b">"
+CURSOR_QUERY = b"\x1b[6n"
+
+def import_times(module="main"):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+def time_to_prompt(model, timeout=30):
+    master, slave = pty.openpty()
+    env = dict(os.environ, TERM=os.environ.get("TERM", "xterm-256color"), COLUMNS="120", LINES="40")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py", "--model", model],
+        cwd=ROOT,
+        stdin=slave,
+        stdout=slave,
+        stderr=slave,
+        env=env,
+        close_fds=True
+    )
+    os.close(slave)
+    output = b""
+    try:
+        while time.perf_counter() - started < timeout:
+            ready, _, _ = select.select([master], [], [], 0.1)
+            if not ready:
+                if process.poll() is not None:
+                    return None
+                continue
+            try:
+                data = os.read(master, 65536)
+            except OSError:
+                return None
+            if not data:
+                return None
+            output += data
+            if CURSOR_QUERY in data:
+                os.write(master, b"\x1b[1;1R")
+            help_at = output.find(HELP_LINE)
+            if help_at >= 0 and PROMPT in output[help_at + len(HELP_LINE):]:
+                return time.perf_counter() - started
+        return None
+    finally:
+        process.kill()
+        process.wait()
+        os.close(master)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Ollumar cold start: import cost and wall-clock time until it accepts input.")
+    parser.add_argument("--model", default="startup-benchmark", help="model name passed to --model so the interactive picker is skipped")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="fail when the median time to first prompt exceeds this")
+    args = parser.parse_args()
+
+    rows = import_times()
+    total_ms = sum(cumulative for _, depth, _, cumulative in rows if depth == 0) / 1000
+    table = Table(title=f"Slowest imports (total {total_ms:.0f} ms)")
+    table.add_column("Module", style="cyan")
+    table.add_column("Self (ms)", justify="right")
+    table.add_column("Cumulative (ms)", justify="right", style="green")
+    for name, _, self_us, cumulative_us in sorted(rows, key=lambda row: row[3], reverse=True)[:args.top]:
+        table.add_row(name, f"{self_us / 1000:.1f}", f"{cumulative_us / 1000:.1f}")
+    console.print(table)
+
+    samples = []
+    for _ in range(max(1, args.runs)):
+        elapsed = time_to_prompt(args.model)
+        if elapsed is None:
+            console.print("[red]Ollumar exited before it was ready for input.[/red]")
+            return 1
+        samples.append(elapsed * 1000)
+    median = statistics.median(samples)
+    console.print(f"[green]Time to first prompt:[/green] median {median:.0f} ms, best {min(samples):.0f} ms over {len(samples)} run(s)")
+    if median > args.budget_ms:
+        console.print(f"[red]Over the startup budget of {args.budget_ms:.0f} ms.[/red]")
+        return 1
+    console.print(f"[green]Within the startup budget of {args.budget_ms:.0f} ms.[/green]")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
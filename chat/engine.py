@@ -0,0 +1,316 @@
+import asyncio
+import datetime
+import re
+import time
+from rich.console import Console
+from api.lifecycle import CancelToken, Cancelled
+from chat.messaging import send_message
+from ui.events import events
+from tools.cache import query_key
+from tools.search import search_duckduckgo, generate_search_query, lookup_results, fetch_result_pages, build_search_context, fan_out_search, search_all, fuse_results, parse_search_queries, FANOUT_DEPTH, speculative_query
+from api.models import supports_tools
+from tools.calling import tool_specs, run_tool_calls, MAX_TOOL_ROUNDS
+from tools.gate import decide_search
+from tools.dedup import MinHashFilter, DEFAULT_THRESHOLD
+from tools.research import ask_input, start_deep_research, generate_research_aspects, perform_deep_research_step, compile_research_results
+from utils.aio import run_blocking
+
+console = Console()
+
+def extract_urls(search_result):
+    urls = []
+    for line in search_result.splitlines():
+        if "Link:" in line:
+            url = line.split("Link:")[-1].strip()
+            if url:
+                urls.append(url)
+    return urls
+
+def print_search_urls(search_result):
+    urls = extract_urls(search_result)
+    if urls:
+        urls_str = "\n" + "\n".join(f"- {url}" for url in urls)
+        console.print(f"[green]Online Search URLs:[/green]\n{urls_str}\n")
+
+def print_search_queries(queries):
+    if len(queries) == 1:
+        console.print(f"[green]Generated search query:[/green] {queries[0]}")
+    else:
+        console.print("[green]Generated search queries:[/green]\n" + "\n".join(f"- {query}" for query in queries))
+
+class ChatSession:
+    def __init__(self, model, config):
+        self.model = model
+        self.config = config
+        self.context = []
+        self.history = []
+        self.tool_fallback = set()
+
+    def clear(self):
+        self.context = []
+        self.history = []
+
+    async def handle_message(self, text, token, ask=ask_input):
+        context_length = len(self.context)
+        history_length = len(self.history)
+        started = time.monotonic()
+        events.emit("turn_start", message=text, model=self.model)
+        try:
+            if self.config.get("deep_research", False):
+                answer = await self.deep_research(text.strip(), token, ask)
+            else:
+                answer = await self.chat_turn(text, token)
+        except Cancelled:
+            del self.context[context_length:]
+            del self.history[history_length:]
+            events.emit("cancelled", seconds=round(time.monotonic() - started, 3))
+            raise
+        events.emit("answer", text=answer, seconds=round(time.monotonic() - started, 3))
+        return answer
+
+    async def chat_turn(self, text, token):
+        config = self.config
+        self.history.append(("User", text))
+        self.context.append({"role": "user", "content": text})
+
+        tools = None
+        if config.get("search", True):
+            search_mode = config.get("search_mode", "auto")
+            if search_mode == "tools":
+                if await run_blocking(supports_tools, self.model):
+                    tools = tool_specs()
+                else:
+                    if self.model not in self.tool_fallback:
+                        self.tool_fallback.add(self.model)
+                        console.print(f"[yellow]{self.model} does not support tool calling, using auto search instead.[/yellow]")
+                    search_mode = "auto"
+            if search_mode == "auto":
+                if await self.needs_search(text, token):
+                    text = await self.auto_search(text, token)
+            elif search_mode == "manual":
+                text = await self.manual_search(text, token)
+            self.context[-1] = {"role": "user", "content": text}
+
+        started = time.monotonic()
+        if tools:
+            response_text = await self.tool_answer(text, token, tools)
+        else:
+            response_text = await run_blocking(send_message, self.model, self.context, text, config=config, token=token)
+        events.emit("timing", stage="answer", seconds=round(time.monotonic() - started, 3))
+        self.history.append(("Assistant", response_text))
+        self.context.append({"role": "assistant", "content": response_text})
+        return response_text
+
+    async def tool_answer(self, text, token, tools):
+        config = self.config
+        dedup = MinHashFilter(config.get("dedup_threshold", DEFAULT_THRESHOLD))
+        for round_number in range(MAX_TOOL_ROUNDS + 1):
+            calls = []
+            response_text = await run_blocking(
+                send_message,
+                self.model,
+                self.context,
+                text,
+                config=config,
+                token=token,
+                tools=tools if round_number < MAX_TOOL_ROUNDS else None,
+                tool_calls=calls
+            )
+            if not calls:
+                return response_text
+            self.context.append({"role": "assistant", "content": response_text.strip(), "tool_calls": calls})
+            results = await run_tool_calls(calls, config, token=token, focus=text, dedup=dedup)
+            for result in results:
+                if result["tool_name"] == "web_search":
+                    print_search_urls(result["content"])
+            self.context.extend(results)
+        return response_text
+
+    async def needs_search(self, text, token):
+        if not self.config.get("search_gate", True):
+            return True
+        if "</think>" in text:
+            text = text.split("</think>")[-1].strip()
+        started = time.monotonic()
+        decision = await run_blocking(decide_search, text, self.model, self.config, has_history=len(self.history) > 1, token=token)
+        events.emit("search_gate", seconds=round(time.monotonic() - started, 3), **decision)
+        if not decision["search"]:
+            console.print(f"[green]Skipping web search:[/green] {decision['reason']} ({decision['confidence']:.0%} confident)")
+        return decision["search"]
+
+    async def generate_queries(self, text, token):
+        count = max(1, self.config.get("search_queries", 1))
+        started = time.monotonic()
+        content = await run_blocking(generate_search_query, text, self.model, self.config, token=token, count=count)
+        events.emit("timing", stage="query_generation", seconds=round(time.monotonic() - started, 3))
+        return parse_search_queries(content, count, text)
+
+    async def prefetch(self, query, token):
+        config = self.config
+        results = await lookup_results(query, config.get("search_count", 2), token=token)
+        if not results:
+            return results, {}
+        pages = await fetch_result_pages(results, token=token, config=config)
+        return results, pages
+
+    async def speculative_search(self, text, token, mode):
+        config = self.config
+        max_results = config.get("search_count", 2)
+        raw_query = speculative_query(text) or text
+        query_token = token.child() if token is not None else CancelToken()
+        raw_token = token.child() if token is not None else CancelToken()
+        started = time.monotonic()
+        query_task = asyncio.ensure_future(self.generate_queries(text, query_token))
+        raw_task = asyncio.ensure_future(self.prefetch(raw_query, raw_token))
+        try:
+            if mode == "first":
+                await asyncio.wait([query_task, raw_task], return_when=asyncio.FIRST_COMPLETED)
+                if raw_task.done() and not raw_task.exception() and raw_task.result()[0]:
+                    query_token.cancel()
+                    results, pages = raw_task.result()
+                    console.print(f"[green]Speculative search query:[/green] {raw_query}")
+                    events.emit("speculative_search", queries=[raw_query], used="speculative", seconds=round(time.monotonic() - started, 3))
+                    return [raw_query], results, pages
+                if not raw_task.done():
+                    raw_token.cancel()
+            queries = await query_task
+            print_search_queries(queries)
+            same = queries == [text] or [query_key(query, max_results) for query in queries] == [query_key(raw_query, max_results)]
+            if mode == "first" and raw_token.cancelled:
+                results = await fan_out_search(queries, max_results, token=token)
+                pages = {}
+                used = "generated"
+            elif same:
+                results, pages = await raw_task
+                used = "speculative"
+            else:
+                lists, (raw_results, pages) = await asyncio.gather(search_all(queries, max_results * FANOUT_DEPTH, token=token), raw_task)
+                results = fuse_results(lists + [raw_results], max_results)
+                used = "fused"
+            if token is not None:
+                token.check()
+            events.emit("speculative_search", queries=queries, speculative_query=raw_query, used=used, seconds=round(time.monotonic() - started, 3))
+            return queries, results, pages
+        finally:
+            query_token.cancel()
+            raw_token.cancel()
+            for task in (query_task, raw_task):
+                task.cancel()
+            await asyncio.gather(query_task, raw_task, return_exceptions=True)
+            query_token.close()
+            raw_token.close()
+
+    async def auto_search(self, text, token):
+        config = self.config
+        if "</think>" in text:
+            text = text.split("</think>")[-1].strip()
+        if text.lower().startswith("search online"):
+            text = text[len("search online"):].strip()
+
+        mode = config.get("speculative_search", "merge")
+        if mode in ("merge", "first"):
+            queries, results, prefetched = await self.speculative_search(text, token, mode)
+        else:
+            queries = await self.generate_queries(text, token)
+            print_search_queries(queries)
+            results = await fan_out_search(queries, config.get("search_count", 2), token=token)
+            prefetched = None
+        if results is None:
+            return text
+        generated_search_query = "; ".join(queries)
+
+        started = time.monotonic()
+        search_result = await build_search_context(
+            results,
+            generated_search_query,
+            token=token,
+            config=config,
+            focus=text,
+            prefetched=prefetched
+        )
+        events.emit("timing", stage="search", seconds=round(time.monotonic() - started, 3))
+        if not search_result:
+            return text
+        print_search_urls(search_result)
+
+        current_date = datetime.datetime.now().strftime("%Y-%m-%d")
+        refined_prompt = (
+            f"Current Date: {current_date}. Search Query: {generated_search_query}. "
+            f"IMPORTANT: Answer using only the information provided in the search results below. Do not include any extraneous commentary or speculation. "
+            f"Online search results for '{generated_search_query}': {search_result} "
+            f"Based on these findings, please address the following inquiry: {text}"
+        )
+        return " ".join(refined_prompt.split())
+
+    async def manual_search(self, text, token):
+        config = self.config
+        match = re.search(r'search\s*"([^"]+)"', text)
+        if not match:
+            return text
+        query = match.group(1)
+        search_result = await search_duckduckgo(
+            query,
+            max_results=config.get("search_count", 2),
+            token=token,
+            config=config,
+            focus=re.sub(r'search\s*"[^"]+"', "", text)
+        )
+
+        text = re.sub(r'search\s*"[^"]+"', "", text).strip()
+        if not search_result:
+            return text or query
+        if not text:
+            refined_prompt = f"A web search was performed; results: {search_result}. No additional query provided."
+        else:
+            refined_prompt = f"A web search was performed; results: {search_result}. Please answer the user's query using these results: {text}"
+        print_search_urls(search_result)
+        return " ".join(refined_prompt.split())
+
+    async def deep_research(self, original_request, token, ask=ask_input):
+        config = self.config
+        total_steps = config.get("deep_research_amount", 4)
+        console.print("[green]Deep Research Mode is active[/green]")
+
+        additional_details = await start_deep_research(self.model, original_request, config, ask=ask, token=token)
+        aspects = await generate_research_aspects(self.model, original_request, additional_details, total_steps, config, token=token)
+
+        combined_summary = ""
+        step_summaries = []
+        previous_queries = []
+        dedup = MinHashFilter(config.get("dedup_threshold", DEFAULT_THRESHOLD))
+
+        for i in range(total_steps):
+            new_summary, query = await perform_deep_research_step(
+                self.model,
+                original_request,
+                additional_details,
+                combined_summary,
+                previous_queries,
+                aspects,
+                i+1,
+                total_steps,
+                config,
+                token=token,
+                dedup=dedup
+            )
+
+            previous_queries.append(query)
+            step_summaries.append(f"--- Step {i+1} Research ---\n{new_summary}")
+
+            if combined_summary:
+                combined_summary += "\n\n" + new_summary
+            else:
+                combined_summary = new_summary
+
+        all_research = "\n\n".join(step_summaries)
+        final_answer = await compile_research_results(self.model, original_request, additional_details, all_research, config, token=token)
+
+        self.history.append(("User", original_request))
+        if additional_details:
+            self.history.append(("User Focus", additional_details))
+        self.history.append(("Research Summary", combined_summary))
+        self.history.append(("Assistant", final_answer))
+
+        self.context.append({"role": "user", "content": original_request})
+        self.context.append({"role": "assistant", "content": final_answer})
+        return final_answer
@@ -1,14 +1,18 @@
-import requests
-import json
-import sys
-import time
 from rich.console import Console
+from api.client import client
+from api.lifecycle import Cancelled
+from api.models import route_model, model_digest
+from api.ndjson import NDJSONReader
+from chat.profiles import generation_profile, profile_options, note_thinking, OutputLimit, response_key, cacheable
+from chat.stream import ThinkStreamParser, TEXT, THINK_START, THINK_STOP
+from tools.cache import search_cache
+from ui.events import events
+from ui.stream import StreamRenderer
 from utils.spinners import FancySpinner
 
 console = Console()
-OLLAMA_API_BASE = "http://localhost:11434"
 
-def send_message(model, context, text, suppress_output=False, config=None):
+def send_message(model, context, text, suppress_output=False, config=None, token=None, tools=None, tool_calls=None, profile="answer"):
     if config is None:
         from main import CONFIG
         config = CONFIG
@@ -17,91 +21,133 @@ def send_message(model, context, text, suppress_output=False, config=None):
     if system_msg and context and context[0].get("role") != "system":
         context.insert(0, {"role": "system", "content": system_msg})
         
+    if isinstance(profile, str):
+        profile = generation_profile(profile)
+    routed = route_model(model, profile.get("task"), config)
+    if routed != model:
+        events.emit("model_route", task=profile.get("task"), model=routed)
+        model = routed
     payload = {
         "model": model,
         "messages": context,
-        "stream": True,
-        "options": {
-            "num_ctx": config.get("context_size", 2048),
-            "top_p": config.get("top_p", 0.9),
-            "top_k": config.get("top_k", 40),
-            "temperature": config.get("temperature", 0.7)
-        }
+        "options": profile_options(profile, config, model)
     }
+    if tools:
+        payload["tools"] = tools
+    
+    cache_key = None
+    if suppress_output and not tools and search_cache.responses_enabled and cacheable(profile, payload["options"]):
+        digest = model_digest(model)
+        if digest:
+            cache_key = response_key(digest, payload, profile)
+            cached = search_cache.get("responses", cache_key)
+            if cached is not None:
+                events.emit("response_cached", task=profile.get("task"), model=model)
+                return cached["text"]
     
     try:
-        response = requests.post(f"{OLLAMA_API_BASE}/api/chat", json=payload, stream=True)
+        response = client.chat(payload, stream=True, token=token)
+    except Cancelled:
+        raise
     except Exception as e:
+        events.emit("error", stage="chat", message=str(e))
         console.print(f"[red]Error connecting to API:[/red] {e}")
         return ""
         
     spinner = None
-    in_think = False
-    start_think_time = None
-    full_response = ""
+    parser = ThinkStreamParser(summary=not suppress_output)
+    thinking = False
+    limit = OutputLimit(profile)
+    renderer = None
+    if not suppress_output and not events.enabled:
+        renderer = StreamRenderer(
+            console,
+            refresh_rate=config.get("refresh_rate", 15),
+            markdown=config.get("render_markdown", True)
+        )
+    
+    def handle(parsed):
+        nonlocal spinner
+        for event in parsed:
+            if event.kind == TEXT:
+                if renderer:
+                    renderer.write(event.text)
+                elif not suppress_output:
+                    events.emit("token", text=event.text)
+            elif event.kind == THINK_START:
+                if not suppress_output:
+                    events.emit("thinking_start")
+                if renderer:
+                    renderer.pause()
+                if spinner is None:
+                    spinner = FancySpinner("Thinking")
+                    spinner.start()
+            elif event.kind == THINK_STOP:
+                if spinner:
+                    spinner.stop()
+                    spinner = None
+                if not suppress_output:
+                    events.emit("thinking_stop", seconds=round(event.elapsed, 3))
+                    console.print(f"[green]Done thinking[/green] - thought for [{event.elapsed:.1f}s]")
     
+    reader = NDJSONReader(response)
+    interrupted = None
     try:
-        for line in response.iter_lines(decode_unicode=True):
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-            except Exception:
-                continue
-                
-            chunk = data.get("message", {}).get("content", "")
-            while chunk:
-                if not in_think:
-                    if "<think>" in chunk:
-                        before, after = chunk.split("<think>", 1)
-                        if not suppress_output:
-                            sys.stdout.write(before)
-                            sys.stdout.flush()
-                        full_response += before
-                        if not full_response.endswith("\n"):
-                            if not suppress_output:
-                                sys.stdout.write("\n")
-                                sys.stdout.flush()
-                            full_response += "\n"
-                        in_think = True
-                        start_think_time = time.time()
-                        if spinner is None:
-                            spinner = FancySpinner("Thinking")
-                            spinner.start()
-                        chunk = after
-                    else:
-                        if not suppress_output:
-                            sys.stdout.write(chunk)
-                            sys.stdout.flush()
-                        full_response += chunk
-                        chunk = ""
-                else:
-                    if "</think>" in chunk:
-                        part, after = chunk.split("</think>", 1)
-                        if spinner:
-                            spinner.stop()
-                            spinner = None
-                        elapsed = time.time() - start_think_time
-                        elapsed_formatted = f"{elapsed:.1f}s"
-                        if not suppress_output:
-                            console.print(f"[green]Done thinking[/green] - thought for [{elapsed_formatted}]")
-                        full_response += f"Done thinking - thought for [{elapsed_formatted}]\n"
-                        in_think = False
-                        chunk = after
-                    else:
-                        chunk = ""
+        for data in reader:
+            if data.get("error"):
+                interrupted = f"API error: {data['error']}"
+                break
+            message = data.get("message", {})
+            if tool_calls is not None and message.get("tool_calls"):
+                tool_calls.extend(message["tool_calls"])
+            chunk = message.get("content", "")
+            if chunk:
+                parsed = parser.feed(chunk)
+                thinking = thinking or any(event.kind == THINK_START for event in parsed)
+                handle(parsed)
+                if limit.active:
+                    for event in parsed:
+                        if event.kind == TEXT:
+                            limit.feed(event.text)
+                    if limit.reached():
+                        events.emit("early_stop", task=profile.get("task"))
+                        break
+            thinking = thinking or bool(message.get("thinking"))
     except KeyboardInterrupt:
+        if token is not None:
+            token.cancel()
+        interrupted = "Interrupted while waiting for response."
+    except Exception as e:
+        if token is not None and token.cancelled:
+            interrupted = "Response cancelled."
+        else:
+            interrupted = f"Response stream stopped: {e}"
+    finally:
+        if token is not None:
+            token.release(response)
+        else:
+            response.close()
         if spinner:
             spinner.stop()
-        console.print("\n[green]Interrupted while waiting for response.[/green]")
-        return full_response
-        
-    if in_think and spinner:
-        spinner.stop()
-        
-    if not full_response.endswith("\n"):
-        if not suppress_output:
-            sys.stdout.write("\n")
-        full_response += "\n"
+            spinner = None
+        note_thinking(model, thinking, bool(parser.text().strip()))
+            
+    if interrupted:
+        if renderer:
+            renderer.close()
+        if suppress_output and token is not None and token.cancelled:
+            raise Cancelled()
+        events.emit("interrupted", reason=interrupted)
+        console.print(f"\n[green]{interrupted}[/green]")
+        return parser.text()
         
-    return full_response
+    handle(parser.close())
+    if renderer:
+        renderer.close()
+    if reader.malformed:
+        events.emit("malformed_frames", count=reader.malformed)
+    if reader.malformed and not suppress_output:
+        console.print(f"[yellow]Skipped {reader.malformed} malformed stream frame(s).[/yellow]")
+    if cache_key and parser.text().strip():
+        search_cache.put("responses", cache_key, {"text": parser.text()})
+    return parser.text()
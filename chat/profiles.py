@@ -0,0 +1,88 @@
+import hashlib
+import json
+
+PROFILES = {
+    "answer": {},
+    "search_query": {"num_predict": 24, "stop": ["\n"], "temperature": 0.4, "lines": 1, "cacheable": True},
+    "search_queries": {"num_predict": 24, "stop": ["\n\n"], "temperature": 0.7, "lines": 1, "cacheable": True},
+    "gate_probe": {"num_predict": 1, "temperature": 0, "words": 1},
+    "clarifying_questions": {"num_predict": 40, "lines": 1, "cacheable": True},
+    "research_aspects": {"num_predict": 32, "lines": 1, "cacheable": True},
+    "research_query": {"num_predict": 24, "stop": ["\n"], "temperature": 0.4, "lines": 1, "cacheable": True},
+    "research_summary": {"num_predict": 600, "cacheable": True},
+}
+
+THINKING = {}
+
+def generation_profile(name, lines=1):
+    profile = dict(PROFILES.get(name, {}), task=name)
+    if "lines" in profile:
+        profile["lines"] = lines * profile["lines"]
+        profile["num_predict"] = lines * profile["num_predict"]
+    return profile
+
+def profile_options(profile, config, model):
+    options = {
+        "num_ctx": config.get("context_size", 2048),
+        "top_p": config.get("top_p", 0.9),
+        "top_k": config.get("top_k", 40),
+        "temperature": profile.get("temperature", config.get("temperature", 0.7))
+    }
+    if THINKING.get(model) is False:
+        if "num_predict" in profile:
+            options["num_predict"] = profile["num_predict"]
+        if profile.get("stop"):
+            options["stop"] = profile["stop"]
+    return options
+
+def note_thinking(model, thinking, answered):
+    if thinking:
+        THINKING[model] = True
+    elif answered:
+        THINKING.setdefault(model, False)
+
+def response_key(digest, payload, profile):
+    messages = [{"role": message.get("role"), "content": " ".join(str(message.get("content", "")).split())} for message in payload["messages"]]
+    options = {name: value for name, value in payload["options"].items() if name not in ("num_predict", "stop")}
+    data = json.dumps({"digest": digest, "messages": messages, "options": options, "profile": profile}, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def cacheable(profile, options):
+    return bool(profile.get("cacheable")) or options.get("temperature") == 0
+
+class OutputLimit:
+    def __init__(self, profile):
+        self.lines = profile.get("lines")
+        self.words = profile.get("words")
+        self.active = bool(self.lines or self.words)
+        self.complete_lines = 0
+        self.partial_line = False
+        self.started_words = 0
+        self.finished_words = 0
+        self.in_word = False
+
+    def feed(self, text):
+        if self.lines:
+            parts = text.split("\n")
+            for part in parts[:-1]:
+                if self.partial_line or part.strip():
+                    self.complete_lines += 1
+                self.partial_line = False
+            if parts[-1].strip():
+                self.partial_line = True
+        if self.words:
+            for char in text:
+                if char.isspace():
+                    if self.in_word:
+                        self.in_word = False
+                        self.finished_words += 1
+                elif not self.in_word:
+                    self.in_word = True
+                    self.started_words += 1
+
+    def reached(self):
+        if self.lines:
+            return self.complete_lines >= self.lines
+        if self.words:
+            return self.started_words > self.words or self.finished_words >= self.words
+        return False
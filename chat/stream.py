@@ -0,0 +1,75 @@
+import time
+from collections import namedtuple
+
+TEXT = "text"
+THINK_START = "think_start"
+THINK_STOP = "think_stop"
+
+StreamEvent = namedtuple("StreamEvent", ["kind", "text", "elapsed"])
+
+class ThinkStreamParser:
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self, clock=time.time, summary=True):
+        self.clock = clock
+        self.summary = summary
+        self.in_think = False
+        self.think_started = None
+        self.pending = ""
+        self.parts = []
+        self.last_char = ""
+
+    def _append(self, text, events):
+        if text:
+            self.parts.append(text)
+            self.last_char = text[-1]
+            events.append(StreamEvent(TEXT, text, None))
+
+    def _split_partial(self, data, tag):
+        for k in range(min(len(tag) - 1, len(data)), 0, -1):
+            if data.endswith(tag[:k]):
+                return data[:-k], data[-k:]
+        return data, ""
+
+    def feed(self, chunk):
+        events = []
+        data = self.pending + chunk
+        self.pending = ""
+        while data:
+            tag = self.CLOSE_TAG if self.in_think else self.OPEN_TAG
+            idx = data.find(tag)
+            if idx < 0:
+                data, self.pending = self._split_partial(data, tag)
+                if not self.in_think:
+                    self._append(data, events)
+                break
+            before, data = data[:idx], data[idx + len(tag):]
+            if not self.in_think:
+                self._append(before, events)
+                if self.last_char != "\n":
+                    self._append("\n", events)
+                self.in_think = True
+                self.think_started = self.clock()
+                events.append(StreamEvent(THINK_START, "", None))
+            else:
+                elapsed = self.clock() - self.think_started
+                self.in_think = False
+                self.think_started = None
+                if self.summary:
+                    self.parts.append(f"Done thinking - thought for [{elapsed:.1f}s]\n")
+                    self.last_char = "\n"
+                events.append(StreamEvent(THINK_STOP, "", elapsed))
+        return events
+
+    def close(self):
+        events = []
+        if not self.in_think:
+            self._append(self.pending, events)
+        self.pending = ""
+        if self.last_char != "\n":
+            self._append("\n", events)
+        return events
+
+    def text(self):
+        return "".join(self.parts)
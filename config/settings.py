@@ -22,7 +22,32 @@ def load_config():
         "top_k": 40,
         "temperature": 0.7,
         "system_prompt": "You are a helpful assistant.",
-        "api_url": "http://localhost:11434"
+        "api_url": "http://localhost:11434",
+        "pool_size": 4,
+        "render_markdown": True,
+        "refresh_rate": 15,
+        "connect_timeout": 5,
+        "first_byte_timeout": 300,
+        "idle_timeout": 60,
+        "query_timeout": 60,
+        "type_ahead": True,
+        "fetch_workers": 4,
+        "fetch_deadline": 8,
+        "html_backend": "auto",
+        "search_cache": True,
+        "cache_ttl": 24,
+        "cache_size": 50,
+        "search_tokens": 800,
+        "dedup_threshold": 0.6,
+        "search_rate": 1.0,
+        "search_burst": 3,
+        "speculative_search": "merge",
+        "search_queries": 1,
+        "search_gate": True,
+        "gate_probe": False,
+        "gate_threshold": 0.5,
+        "helper_model": "",
+        "response_cache": False
     }
     if os.path.exists(config_path):
         try:
@@ -48,7 +73,7 @@ def load_config():
                             config["search_amount"] = 500
                     elif line.startswith("search_mode="):
                         value = line.split("=")[1].strip().lower()
-                        if value in ["auto", "manual"]:
+                        if value in ["auto", "manual", "tools"]:
                             config["search_mode"] = value
                         else:
                             config["search_mode"] = "auto"
@@ -89,6 +114,129 @@ def load_config():
                         config["system_prompt"] = line.split("=", 1)[1].strip()
                     elif line.startswith("api_url="):
                         config["api_url"] = line.split("=", 1)[1].strip()
+                    elif line.startswith("pool_size="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["pool_size"] = max(1, int(value))
+                        except ValueError:
+                            config["pool_size"] = 4
+                    elif line.startswith("render_markdown="):
+                        value = line.split("=")[1].strip().lower()
+                        config["render_markdown"] = (value == "true")
+                    elif line.startswith("refresh_rate="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["refresh_rate"] = max(1, int(value))
+                        except ValueError:
+                            config["refresh_rate"] = 15
+                    elif line.startswith("connect_timeout="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["connect_timeout"] = float(value)
+                        except ValueError:
+                            config["connect_timeout"] = 5
+                    elif line.startswith("first_byte_timeout="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["first_byte_timeout"] = float(value)
+                        except ValueError:
+                            config["first_byte_timeout"] = 300
+                    elif line.startswith("idle_timeout="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["idle_timeout"] = float(value)
+                        except ValueError:
+                            config["idle_timeout"] = 60
+                    elif line.startswith("query_timeout="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["query_timeout"] = float(value)
+                        except ValueError:
+                            config["query_timeout"] = 60
+                    elif line.startswith("type_ahead="):
+                        value = line.split("=")[1].strip().lower()
+                        config["type_ahead"] = (value == "true")
+                    elif line.startswith("fetch_workers="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["fetch_workers"] = int(value)
+                        except ValueError:
+                            config["fetch_workers"] = 4
+                    elif line.startswith("fetch_deadline="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["fetch_deadline"] = float(value)
+                        except ValueError:
+                            config["fetch_deadline"] = 8
+                    elif line.startswith("html_backend="):
+                        value = line.split("=", 1)[1].strip()
+                        config["html_backend"] = value or "auto"
+                    elif line.startswith("search_cache="):
+                        value = line.split("=")[1].strip().lower()
+                        config["search_cache"] = (value == "true")
+                    elif line.startswith("cache_ttl="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["cache_ttl"] = float(value)
+                        except ValueError:
+                            config["cache_ttl"] = 24
+                    elif line.startswith("cache_size="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["cache_size"] = int(value)
+                        except ValueError:
+                            config["cache_size"] = 50
+                    elif line.startswith("search_tokens="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["search_tokens"] = int(value)
+                        except ValueError:
+                            config["search_tokens"] = 800
+                    elif line.startswith("dedup_threshold="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["dedup_threshold"] = float(value)
+                        except ValueError:
+                            config["dedup_threshold"] = 0.6
+                    elif line.startswith("search_rate="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["search_rate"] = float(value)
+                        except ValueError:
+                            config["search_rate"] = 1.0
+                    elif line.startswith("search_burst="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["search_burst"] = int(value)
+                        except ValueError:
+                            config["search_burst"] = 3
+                    elif line.startswith("speculative_search="):
+                        value = line.split("=", 1)[1].strip()
+                        config["speculative_search"] = value
+                    elif line.startswith("search_queries="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["search_queries"] = int(value)
+                        except ValueError:
+                            config["search_queries"] = 1
+                    elif line.startswith("search_gate="):
+                        value = line.split("=")[1].strip().lower()
+                        config["search_gate"] = (value == "true")
+                    elif line.startswith("gate_probe="):
+                        value = line.split("=")[1].strip().lower()
+                        config["gate_probe"] = (value == "true")
+                    elif line.startswith("gate_threshold="):
+                        value = line.split("=")[1].strip()
+                        try:
+                            config["gate_threshold"] = float(value)
+                        except ValueError:
+                            config["gate_threshold"] = 0.5
+                    elif line.startswith("helper_model="):
+                        value = line.split("=", 1)[1].strip()
+                        config["helper_model"] = value
+                    elif line.startswith("response_cache="):
+                        value = line.split("=")[1].strip().lower()
+                        config["response_cache"] = (value == "true")
         except Exception as e:
             console.print(f"[red]Error reading config:[/red] {e}")
     else:
@@ -112,6 +260,31 @@ def save_config(config):
             f.write(f"temperature={config.get('temperature', 0.7)}\n")
             f.write(f"system_prompt={config.get('system_prompt', 'You are a helpful assistant.')}\n")
             f.write(f"api_url={config.get('api_url', 'http://localhost:11434')}\n")
+            f.write(f"pool_size={config.get('pool_size', 4)}\n")
+            f.write(f"render_markdown={'true' if config.get('render_markdown', True) else 'false'}\n")
+            f.write(f"refresh_rate={config.get('refresh_rate', 15)}\n")
+            f.write(f"connect_timeout={config.get('connect_timeout', 5)}\n")
+            f.write(f"first_byte_timeout={config.get('first_byte_timeout', 300)}\n")
+            f.write(f"idle_timeout={config.get('idle_timeout', 60)}\n")
+            f.write(f"query_timeout={config.get('query_timeout', 60)}\n")
+            f.write(f"type_ahead={'true' if config.get('type_ahead', True) else 'false'}\n")
+            f.write(f"fetch_workers={config.get('fetch_workers', 4)}\n")
+            f.write(f"fetch_deadline={config.get('fetch_deadline', 8)}\n")
+            f.write(f"html_backend={config.get('html_backend', 'auto')}\n")
+            f.write(f"search_cache={'true' if config.get('search_cache', True) else 'false'}\n")
+            f.write(f"cache_ttl={config.get('cache_ttl', 24)}\n")
+            f.write(f"cache_size={config.get('cache_size', 50)}\n")
+            f.write(f"search_tokens={config.get('search_tokens', 800)}\n")
+            f.write(f"dedup_threshold={config.get('dedup_threshold', 0.6)}\n")
+            f.write(f"search_rate={config.get('search_rate', 1.0)}\n")
+            f.write(f"search_burst={config.get('search_burst', 3)}\n")
+            f.write(f"speculative_search={config.get('speculative_search', 'merge')}\n")
+            f.write(f"search_queries={config.get('search_queries', 1)}\n")
+            f.write(f"search_gate={'true' if config.get('search_gate', True) else 'false'}\n")
+            f.write(f"gate_probe={'true' if config.get('gate_probe', False) else 'false'}\n")
+            f.write(f"gate_threshold={config.get('gate_threshold', 0.5)}\n")
+            f.write(f"helper_model={config.get('helper_model', '')}\n")
+            f.write(f"response_cache={'true' if config.get('response_cache', False) else 'false'}\n")
     except Exception as e:
         console.print(f"[red]Error saving config:[/red] {e}")
 
@@ -129,7 +302,32 @@ def reset_settings():
         "top_k": 40,
         "temperature": 0.7,
         "system_prompt": "You are a helpful assistant.",
-        "api_url": "http://localhost:11434"
+        "api_url": "http://localhost:11434",
+        "pool_size": 4,
+        "render_markdown": True,
+        "refresh_rate": 15,
+        "connect_timeout": 5,
+        "first_byte_timeout": 300,
+        "idle_timeout": 60,
+        "query_timeout": 60,
+        "type_ahead": True,
+        "fetch_workers": 4,
+        "fetch_deadline": 8,
+        "html_backend": "auto",
+        "search_cache": True,
+        "cache_ttl": 24,
+        "cache_size": 50,
+        "search_tokens": 800,
+        "dedup_threshold": 0.6,
+        "search_rate": 1.0,
+        "search_burst": 3,
+        "speculative_search": "merge",
+        "search_queries": 1,
+        "search_gate": True,
+        "gate_probe": False,
+        "gate_threshold": 0.5,
+        "helper_model": "",
+        "response_cache": False
     }
     save_config(config)
     return config
@@ -85,7 +85,9 @@ install_app() {
     source "$VENV_DIR/bin/activate"
     echo "Installing Python dependencies..."
     pip install --upgrade pip
-    pip install prompt_toolkit rich duckduckgo_search requests beautifulsoup4
+    pip install prompt_toolkit rich duckduckgo_search requests
+    pip install selectolax || pip install lxml || echo "No fast HTML parser available, falling back to html.parser."
+    pip install orjson || echo "orjson unavailable, falling back to the standard json module."
     
     echo "Copying application files..."
     cp "$SOURCE_DIR/main.py" "$INSTALL_DIR/"
@@ -99,12 +101,30 @@ install_app() {
     
     cp "$SOURCE_DIR/config/settings.py" "$INSTALL_DIR/config/"
     cp "$SOURCE_DIR/ui/display.py" "$INSTALL_DIR/ui/"
+    cp "$SOURCE_DIR/ui/events.py" "$INSTALL_DIR/ui/"
+    cp "$SOURCE_DIR/ui/status.py" "$INSTALL_DIR/ui/"
+    cp "$SOURCE_DIR/ui/stream.py" "$INSTALL_DIR/ui/"
+    cp "$SOURCE_DIR/api/client.py" "$INSTALL_DIR/api/"
+    cp "$SOURCE_DIR/api/lifecycle.py" "$INSTALL_DIR/api/"
     cp "$SOURCE_DIR/api/models.py" "$INSTALL_DIR/api/"
+    cp "$SOURCE_DIR/api/ndjson.py" "$INSTALL_DIR/api/"
+    cp "$SOURCE_DIR/tools/calling.py" "$INSTALL_DIR/tools/"
+    cp "$SOURCE_DIR/tools/cache.py" "$INSTALL_DIR/tools/"
+    cp "$SOURCE_DIR/tools/dedup.py" "$INSTALL_DIR/tools/"
+    cp "$SOURCE_DIR/tools/extract.py" "$INSTALL_DIR/tools/"
+    cp "$SOURCE_DIR/tools/fetch.py" "$INSTALL_DIR/tools/"
+    cp "$SOURCE_DIR/tools/gate.py" "$INSTALL_DIR/tools/"
+    cp "$SOURCE_DIR/tools/limiter.py" "$INSTALL_DIR/tools/"
+    cp "$SOURCE_DIR/tools/rank.py" "$INSTALL_DIR/tools/"
     cp "$SOURCE_DIR/tools/search.py" "$INSTALL_DIR/tools/"
     cp "$SOURCE_DIR/tools/research.py" "$INSTALL_DIR/tools/"
+    cp "$SOURCE_DIR/chat/engine.py" "$INSTALL_DIR/chat/"
     cp "$SOURCE_DIR/chat/history.py" "$INSTALL_DIR/chat/"
     cp "$SOURCE_DIR/chat/messaging.py" "$INSTALL_DIR/chat/"
+    cp "$SOURCE_DIR/chat/profiles.py" "$INSTALL_DIR/chat/"
+    cp "$SOURCE_DIR/chat/stream.py" "$INSTALL_DIR/chat/"
     cp "$SOURCE_DIR/utils/commands.py" "$INSTALL_DIR/utils/"
+    cp "$SOURCE_DIR/utils/aio.py" "$INSTALL_DIR/utils/"
     cp "$SOURCE_DIR/utils/spinners.py" "$INSTALL_DIR/utils/"
     
     echo "Creating launcher script..."
@@ -112,7 +132,7 @@ install_app() {
 #!/bin/bash
 source "$VENV_DIR/bin/activate"
 cd "$INSTALL_DIR"
-python main.py
+python main.py "\$@"
 EOL
     chmod +x "$INSTALL_DIR/launch.sh"
     
@@ -121,7 +141,7 @@ EOL
         
         cat > "/tmp/$APP_NAME" <<EOL
 #!/bin/bash
-"$INSTALL_DIR/launch.sh"
+"$INSTALL_DIR/launch.sh" "\$@"
 EOL
         
         sudo mv "/tmp/$APP_NAME" "$BIN_PATH"
@@ -1,45 +1,665 @@
 import os
 import sys
+import asyncio
+import collections
+import signal
 import threading
 import time
-import re
-import datetime
 import json
 from config.settings import load_config, save_config, reset_settings
-from ui.display import display_logo, display_settings, clear_screen
-from api.models import select_model
-from chat.messaging import send_message
+from ui.display import display_logo, display_settings, display_cache_stats, clear_screen
+from ui.events import events
+from ui.status import status_board
+from api.client import client
+from api.lifecycle import CancelToken, Cancelled
+from api.models import select_model, warm_up, installed_models, full_name
+from chat.engine import ChatSession
+from tools.cache import search_cache
+from tools.limiter import search_limiter, search_breaker
 from chat.history import save_chat_session, load_chat_session, view_history_sessions
-from tools.search import search_duckduckgo, generate_search_query
-from tools.research import perform_deep_research_step, start_deep_research, compile_research_results
 from utils.commands import setup_command_completer, print_help, format_history_line
-from utils.spinners import FancySpinner, Spinner
+from utils.aio import engine_loop
 from prompt_toolkit import PromptSession
+from prompt_toolkit.patch_stdout import patch_stdout
 from prompt_toolkit.styles import Style
 from rich.console import Console
+from rich.text import Text
 
 console = Console()
 current_history_file = None
 CONFIG = {}
-DEEP_RESEARCH_ENABLED = False
-DEEP_RESEARCH_AMOUNT = 4
-OLLAMA_API_BASE = "http://localhost:11434"
 BASE_DIR = os.path.join(os.path.expanduser("~"), "ollumar", "data")
 HISTORY_DIR = os.path.join(BASE_DIR, "history")
 
 def check_dependencies():
     return
 
+def handle_command(text, chat):
+    global current_history_file, CONFIG
+    config = chat.config
+    cmd = text.strip().split(maxsplit=1)
+    base_cmd = cmd[0]
+    
+    if base_cmd == "/help":
+        print_help()
+        return True
+        
+    elif base_cmd == "/settings":
+        display_settings(config)
+        return True
+        
+    elif base_cmd == "/reset":
+        config = reset_settings()
+        CONFIG = config
+        chat.config = config
+        client.configure(config)
+        search_cache.configure(config)
+        search_limiter.configure(config)
+        console.print("[green]All settings have been reset to default values.[/green]")
+        display_settings(config)
+        return True
+        
+    elif base_cmd == "/context_size":
+        if len(cmd) != 2:
+            console.print("[green]Usage: /context_size <number>[/green]")
+            return True
+        try:
+            new_size = int(cmd[1])
+            config["context_size"] = new_size
+            save_config(config)
+            console.print(f"[green]Context size set to {new_size}.[/green]")
+        except ValueError:
+            console.print("[green]Invalid context size number.[/green]")
+        return True
+        
+    elif base_cmd == "/set_system_prompt":
+        if len(cmd) != 2:
+            console.print("[green]Usage: /set_system_prompt <text>[/green]")
+            return True
+        new_prompt = cmd[1].strip()
+        config["system_prompt"] = new_prompt
+        save_config(config)
+        console.print(f"[green]System prompt set to: {new_prompt}[/green]")
+        
+        if chat.context and chat.context[0].get("role") == "system":
+            chat.context[0]["content"] = new_prompt
+        else:
+            chat.context.insert(0, {"role": "system", "content": new_prompt})
+        return True
+        
+    elif base_cmd == "/set_top_p":
+        if len(cmd) != 2:
+            console.print("[green]Usage: /set_top_p <number>[/green]")
+            return True
+        try:
+            new_value = float(cmd[1])
+            if new_value <= 0 or new_value > 1:
+                console.print("[green]top_p must be between 0 and 1[/green]")
+                return True
+            config["top_p"] = new_value
+            save_config(config)
+            console.print(f"[green]top_p set to {new_value}.[/green]")
+        except ValueError:
+            console.print("[green]Invalid number.[/green]")
+        return True
+        
+    elif base_cmd == "/set_top_k":
+        if len(cmd) != 2:
+            console.print("[green]Usage: /set_top_k <number>[/green]")
+            return True
+        try:
+            new_value = int(cmd[1])
+            if new_value <= 0:
+                console.print("[green]top_k must be greater than 0[/green]")
+                return True
+            config["top_k"] = new_value
+            save_config(config)
+            console.print(f"[green]top_k set to {new_value}.[/green]")
+        except ValueError:
+            console.print("[green]Invalid number.[/green]")
+        return True
+        
+    elif base_cmd == "/set_temperature":
+        if len(cmd) != 2:
+            console.print("[green]Usage: /set_temperature <number>[/green]")
+            return True
+        try:
+            new_value = float(cmd[1])
+            if new_value < 0:
+                console.print("[green]temperature must be non-negative[/green]")
+                return True
+            config["temperature"] = new_value
+            save_config(config)
+            console.print(f"[green]temperature set to {new_value}.[/green]")
+        except ValueError:
+            console.print("[green]Invalid number.[/green]")
+        return True
+        
+    elif base_cmd == "/history":
+        loaded_history, loaded_context, filename = view_history_sessions()
+        if loaded_history is not None and loaded_context is not None:
+            current_history_file = filename
+            chat.history = loaded_history
+            chat.context = loaded_context
+            clear_screen()
+            console.print("[green]Session loaded. You can continue the conversation.[/green]\n")
+            for role, msg in chat.history:
+                console.print(format_history_line(role, msg))
+            console.print("")
+        return True
+        
+    elif base_cmd == "/clear":
+        chat.clear()
+        clear_screen()
+        display_settings(config)
+        console.print("[green]Type [yellow]/help[/yellow] to see available commands.[/green]")
+        console.print("[green]Chat cleared.[/green]")
+        return True
+        
+    elif base_cmd == "/exit":
+        return False
+        
+    elif base_cmd == "/toggle_history":
+        config["history"] = not config.get("history", True)
+        save_config(config)
+        state = "enabled" if config["history"] else "disabled"
+        console.print(f"[green]History has been {state}.[/green]")
+        return True
+        
+    elif base_cmd == "/toggle_search":
+        config["search"] = not config.get("search", True)
+        save_config(config)
+        state = "enabled" if config["search"] else "disabled"
+        console.print(f"[green]Internet search has been {state}.[/green]")
+        return True
+        
+    elif base_cmd == "/toggle_search_mode":
+        current_mode = config.get("search_mode", "auto")
+        new_mode = {"auto": "manual", "manual": "tools"}.get(current_mode, "auto")
+        config["search_mode"] = new_mode
+        save_config(config)
+        console.print(f"[green]Search mode has been changed to: {new_mode}.[/green]")
+        return True
+        
+    elif base_cmd == "/search_gate":
+        mode = cmd[1].strip().lower() if len(cmd) == 2 else ""
+        if mode not in ("on", "off", "probe"):
+            current = "probe" if config.get("gate_probe", False) else "on"
+            console.print(f"[green]Usage: /search_gate <on|off|probe> (currently {current if config.get('search_gate', True) else 'off'})[/green]")
+            return True
+        config["search_gate"] = mode != "off"
+        config["gate_probe"] = mode == "probe"
+        save_config(config)
+        console.print(f"[green]Search gate has been set to: {mode}.[/green]")
+        return True
+        
+    elif base_cmd == "/speculative_search":
+        mode = cmd[1].strip().lower() if len(cmd) == 2 else ""
+        if mode not in ("merge", "first", "off"):
+            console.print(f"[green]Usage: /speculative_search <merge|first|off> (currently {config.get('speculative_search', 'merge')})[/green]")
+            return True
+        config["speculative_search"] = mode
+        save_config(config)
+        console.print(f"[green]Speculative search has been set to: {mode}.[/green]")
+        return True
+        
+    elif base_cmd == "/search_count":
+        if len(cmd) < 2:
+            console.print("[green]Usage: /search_count <number>[/green]")
+        else:
+            try:
+                count = int(cmd[1])
+                if count <= 0:
+                    raise ValueError
+                config["search_count"] = count
+                save_config(config)
+                console.print(f"[green]Search result count set to {count}.[/green]")
+            except ValueError:
+                console.print("[green]Invalid number provided.[/green]")
+        return True
+        
+    elif base_cmd == "/search_amount":
+        if len(cmd) < 2:
+            console.print("[green]Usage: /search_amount <number>[/green]")
+        else:
+            try:
+                amount = int(cmd[1])
+                if amount <= 0:
+                    raise ValueError
+                config["search_amount"] = amount
+                save_config(config)
+                console.print(f"[green]Pages read by the model are now cut to {amount} words.[/green]")
+            except ValueError:
+                console.print("[green]Invalid number provided.[/green]")
+        return True
+        
+    elif base_cmd == "/search_tokens":
+        if len(cmd) < 2:
+            console.print("[green]Usage: /search_tokens <number>[/green]")
+        else:
+            try:
+                tokens = int(cmd[1])
+                if tokens <= 0:
+                    raise ValueError
+                config["search_tokens"] = tokens
+                save_config(config)
+                console.print(f"[green]Search context budget set to {tokens} tokens.[/green]")
+            except ValueError:
+                console.print("[green]Invalid number provided.[/green]")
+        return True
+        
+    elif base_cmd == "/search_queries":
+        if len(cmd) < 2:
+            console.print("[green]Usage: /search_queries <number>[/green]")
+        else:
+            try:
+                count = int(cmd[1])
+                if count <= 0 or count > 5:
+                    raise ValueError
+                config["search_queries"] = count
+                save_config(config)
+                console.print(f"[green]Auto search will now generate {count} search quer{'y' if count == 1 else 'ies'} per question.[/green]")
+            except ValueError:
+                console.print("[green]Please provide a number from 1 to 5.[/green]")
+        return True
+        
+    elif base_cmd == "/search_status":
+        console.print(f"[green]Search rate limit:[/green] {search_limiter.describe()}")
+        console.print(f"[green]Search circuit breaker:[/green] {search_breaker.describe()}")
+        return True
+        
+    elif base_cmd == "/toggle_search_cache":
+        config["search_cache"] = not config.get("search_cache", True)
+        save_config(config)
+        search_cache.configure(config)
+        state = "enabled" if config["search_cache"] else "disabled"
+        console.print(f"[green]Search cache has been {state}.[/green]")
+        return True
+        
+    elif base_cmd == "/toggle_response_cache":
+        config["response_cache"] = not config.get("response_cache", False)
+        save_config(config)
+        search_cache.configure(config)
+        state = "enabled" if config["response_cache"] else "disabled"
+        console.print(f"[green]Model response cache has been {state}.[/green]")
+        return True
+        
+    elif base_cmd == "/cache_stats":
+        display_cache_stats(search_cache.stats(), config)
+        return True
+        
+    elif base_cmd == "/cache_ttl":
+        if len(cmd) < 2:
+            console.print("[green]Usage: /cache_ttl <hours>[/green]")
+        else:
+            try:
+                hours = float(cmd[1])
+                if hours <= 0:
+                    raise ValueError
+                config["cache_ttl"] = hours
+                save_config(config)
+                search_cache.configure(config)
+                console.print(f"[green]Search cache entries now stay fresh for {hours} hours.[/green]")
+            except ValueError:
+                console.print("[green]Invalid number provided.[/green]")
+        return True
+        
+    elif base_cmd == "/purge_cache":
+        target = cmd[1].strip().lower() if len(cmd) == 2 else "all"
+        if target not in ("all", "queries", "pages", "responses", "expired"):
+            console.print("[green]Usage: /purge_cache \\[queries|pages|responses|expired][/green]")
+            return True
+        if target == "expired":
+            removed = search_cache.purge(expired_only=True)
+        else:
+            removed = search_cache.purge(layer=None if target == "all" else target)
+        console.print(f"[green]Removed {removed} cached search entr{'y' if removed == 1 else 'ies'}.[/green]")
+        return True
+        
+    elif base_cmd == "/toggle_markdown":
+        config["render_markdown"] = not config.get("render_markdown", True)
+        save_config(config)
+        state = "enabled" if config["render_markdown"] else "disabled"
+        console.print(f"[green]Markdown rendering has been {state}.[/green]")
+        return True
+        
+    elif base_cmd == "/refresh_rate":
+        if len(cmd) < 2:
+            console.print("[green]Usage: /refresh_rate <number>[/green]")
+        else:
+            try:
+                rate = int(cmd[1])
+                if rate <= 0:
+                    raise ValueError
+                config["refresh_rate"] = rate
+                save_config(config)
+                console.print(f"[green]Output refresh rate set to {rate} frames per second.[/green]")
+            except ValueError:
+                console.print("[green]Invalid number provided.[/green]")
+        return True
+        
+    elif base_cmd == "/toggle_type_ahead":
+        config["type_ahead"] = not config.get("type_ahead", True)
+        save_config(config)
+        state = "enabled" if config["type_ahead"] else "disabled"
+        console.print(f"[green]Type-ahead input has been {state}.[/green]")
+        return True
+        
+    elif base_cmd == "/change_model":
+        chat.model = select_model(config)
+        clear_screen()
+        display_settings(config)
+        console.print(f"[green]Model changed to: {chat.model}[/green]")
+        return True
+        
+    elif base_cmd == "/helper_model":
+        if len(cmd) < 2:
+            console.print(f"[green]Usage: /helper_model <model_name|off> (currently {config.get('helper_model') or 'off'})[/green]")
+            return True
+        name = cmd[1].strip()
+        if name.lower() in ("off", "none"):
+            config["helper_model"] = ""
+            save_config(config)
+            console.print("[green]Background tasks will use the chat model.[/green]")
+            return True
+        installed = installed_models(refresh=True)
+        if installed is not None and full_name(name) not in installed:
+            console.print(f"[green]{name} is not pulled. Pull it from /change_model with 'p {name}' first.[/green]")
+            return True
+        config["helper_model"] = name
+        save_config(config)
+        warm_up(name)
+        console.print(f"[green]Query writing, research outlines and step summaries will use {name}.[/green]")
+        return True
+        
+    elif base_cmd == "/toggle_deep_research":
+        config["deep_research"] = not config.get("deep_research", False)
+        save_config(config)
+        state = "enabled" if config["deep_research"] else "disabled"
+        console.print(f"[green]Deep research mode has been {state}.[/green]")
+        return True
+        
+    elif base_cmd == "/deep_research_amount":
+        if len(cmd) < 2:
+            console.print("[green]Usage: /deep_research_amount <number>[/green]")
+        else:
+            try:
+                amt = int(cmd[1])
+                if amt < 1:
+                    raise ValueError
+                config["deep_research_amount"] = amt
+                save_config(config)
+                console.print(f"[green]Deep research iterations set to {amt}.[/green]")
+            except ValueError:
+                console.print("[green]Invalid number provided for deep research amount.[/green]")
+        return True
+        
+    else:
+        console.print("[green]Unknown command.[/green] Type [yellow]/help[/yellow] to see available commands.")
+        return True
+
+class Repl:
+    def __init__(self, chat, session):
+        self.chat = chat
+        self.session = session
+        self.pending = collections.deque()
+        self.asks = None
+        self.loop = None
+        self.turn = None
+        self.token = None
+        self.draft = ""
+        self.running = True
+
+    def type_ahead(self):
+        return self.chat.config.get("type_ahead", True)
+
+    def toolbar(self):
+        if self.turn is None:
+            return None
+        status = status_board.describe() or "Generating response"
+        queued = f" | {len(self.pending)} queued" if self.pending else ""
+        return f" {status}{queued} | Ctrl-C or /stop to interrupt"
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.asks = asyncio.Queue()
+        while self.running:
+            if self.turn is None and self.pending:
+                self.dispatch(self.pending.popleft())
+                continue
+            if self.turn is not None and not self.type_ahead():
+                await self.wait_turn()
+                continue
+            text = await self.read()
+            if text is None or not text.strip():
+                continue
+            if self.turn is None:
+                self.dispatch(text)
+            elif text.strip() == "/stop":
+                self.interrupt()
+            else:
+                self.pending.append(text)
+                console.print(f"[green]Queued:[/green] {text}")
+        if self.turn is not None:
+            self.interrupt()
+            await self.wait_turn()
+
+    async def read(self):
+        status_board.set_passive(True)
+        try:
+            with patch_stdout(raw=True):
+                return await self._read()
+        finally:
+            if self.turn is None or not self.type_ahead():
+                status_board.set_passive(False)
+
+    async def _read(self):
+        prompt_task = asyncio.ensure_future(self.session.prompt_async(
+            "> ",
+            default=self.draft,
+            bottom_toolbar=self.toolbar,
+            refresh_interval=0.5
+        ))
+        self.draft = ""
+        ask_task = asyncio.ensure_future(self.asks.get())
+        waiters = {prompt_task, ask_task}
+        if self.turn is not None and self.pending:
+            waiters.add(self.turn)
+        done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        if prompt_task in done:
+            ask_task.cancel()
+            try:
+                return prompt_task.result()
+            except KeyboardInterrupt:
+                if self.turn is not None:
+                    self.interrupt()
+                return None
+            except EOFError:
+                self.running = False
+                return None
+        self.draft = self.session.default_buffer.text
+        prompt_task.cancel()
+        await asyncio.gather(prompt_task, return_exceptions=True)
+        if ask_task in done:
+            await self.answer(*ask_task.result())
+        else:
+            ask_task.cancel()
+        return None
+
+    async def wait_turn(self):
+        status_board.set_passive(False)
+        try:
+            self.loop.add_signal_handler(signal.SIGINT, self.interrupt)
+        except (NotImplementedError, RuntimeError):
+            pass
+        try:
+            while self.turn is not None:
+                ask_task = asyncio.ensure_future(self.asks.get())
+                done, _ = await asyncio.wait({self.turn, ask_task}, return_when=asyncio.FIRST_COMPLETED)
+                if ask_task in done:
+                    await self.answer(*ask_task.result())
+                else:
+                    ask_task.cancel()
+        finally:
+            try:
+                self.loop.remove_signal_handler(signal.SIGINT)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+    async def answer(self, message, future):
+        try:
+            text = await PromptSession().prompt_async(Text.from_markup(message).plain)
+        except (KeyboardInterrupt, EOFError):
+            self.interrupt()
+            if not future.done():
+                future.set_exception(Cancelled())
+            return
+        if not future.done():
+            future.set_result(text)
+
+    async def ask(self, message):
+        future = self.loop.create_future()
+        await self.asks.put((message, future))
+        return await future
+
+    async def ask_from_engine(self, message):
+        future = asyncio.run_coroutine_threadsafe(self.ask(message), self.loop)
+        return await asyncio.wrap_future(future)
+
+    def dispatch(self, text):
+        if text.startswith("/"):
+            if text.strip() == "/stop":
+                console.print("[green]Nothing to stop.[/green]")
+            elif not self.run_command(text):
+                self.running = False
+            return
+        self.token = CancelToken()
+        self.turn = asyncio.wrap_future(engine_loop.submit(
+            self.chat.handle_message(text, self.token, ask=self.ask_from_engine)
+        ))
+        self.turn.add_done_callback(self.finish_turn)
+
+    def run_command(self, text):
+        handler = signal.getsignal(signal.SIGINT)
+        try:
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+        except ValueError:
+            handler = None
+        try:
+            return handle_command(text, self.chat)
+        except KeyboardInterrupt:
+            console.print("\n[green]Command interrupted.[/green]")
+            return True
+        finally:
+            if handler is not None:
+                signal.signal(signal.SIGINT, handler)
+
+    def interrupt(self):
+        if self.token is not None:
+            self.token.cancel()
+
+    def finish_turn(self, future):
+        self.turn = None
+        if self.token is not None:
+            self.token.close()
+            self.token = None
+        if future.cancelled():
+            return
+        error = future.exception()
+        if isinstance(error, Cancelled):
+            console.print("\n[green]Request cancelled.[/green]")
+        elif error is not None:
+            console.print(f"\n[red]Error:[/red] {error}")
+
+def parse_args(argv):
+    options = {"json": "--json" in argv or not sys.stdout.isatty(), "model": None}
+    if "--model" in argv:
+        index = argv.index("--model")
+        if index + 1 < len(argv):
+            options["model"] = argv[index + 1]
+    return options
+
+def read_json_message(line):
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        try:
+            return str(json.loads(line).get("message", "")).strip() or None
+        except (ValueError, AttributeError):
+            pass
+    return line
+
+async def ask_from_stdin(message):
+    events.emit("question", prompt=Text.from_markup(message).plain)
+    line = await asyncio.get_running_loop().run_in_executor(None, sys.stdin.readline)
+    if not line:
+        raise Cancelled()
+    return read_json_message(line) or ""
+
+def run_json(config, model_name):
+    events.enable(sys.stdout)
+    sys.stdout = open(os.devnull, "w")
+    status_board.set_passive(True)
+    if not model_name:
+        models = client.list_models()
+        if not models:
+            events.emit("error", stage="startup", message=f"No models available at {config.get('api_url')}")
+            return None
+        model_name = models[0]["name"]
+    warm_up(model_name)
+    if config.get("helper_model"):
+        warm_up(config["helper_model"])
+    chat = ChatSession(model_name, config)
+    events.emit("ready", model=model_name)
+    try:
+        for line in sys.stdin:
+            text = read_json_message(line)
+            if text is None:
+                continue
+            if text.startswith("/"):
+                events.emit("error", stage="command", message="Slash commands are not available in JSON mode")
+                continue
+            token = CancelToken()
+            try:
+                engine_loop.submit(chat.handle_message(text, token, ask=ask_from_stdin)).result()
+            except KeyboardInterrupt:
+                token.cancel()
+                raise
+            except Cancelled:
+                pass
+            except Exception as e:
+                events.emit("error", stage="turn", message=str(e))
+            finally:
+                token.close()
+    except KeyboardInterrupt:
+        pass
+    return chat
+
 def main():
-    global current_history_file, CONFIG, DEEP_RESEARCH_ENABLED, DEEP_RESEARCH_AMOUNT, OLLAMA_API_BASE
+    global current_history_file, CONFIG
+    options = parse_args(sys.argv[1:])
     config = load_config()
     CONFIG = config
-    OLLAMA_API_BASE = config.get("api_url", "http://localhost:11434")
-    DEEP_RESEARCH_ENABLED = config.get("deep_research", False)
-    DEEP_RESEARCH_AMOUNT = config.get("deep_research_amount", 4)
-    model = select_model()
-    session_history = []
-    context = []
+    client.configure(config)
+    search_cache.configure(config)
+    search_limiter.configure(config)
+    if options["json"]:
+        chat = run_json(config, options["model"])
+        if chat is not None:
+            save_chat_session(chat.history, CONFIG)
+        engine_loop.close()
+        client.close()
+        search_cache.close()
+        return
+    if options["model"]:
+        model = options["model"]
+        warm_up(model)
+    else:
+        model = select_model(config)
+    if config.get("helper_model"):
+        warm_up(config["helper_model"])
+    chat = ChatSession(model, config)
     
     command_completer = setup_command_completer()
     
@@ -58,361 +678,16 @@ def main():
     
     console.print("[green]Type [yellow]/help[/yellow] to see available commands.[/green]")
     
-    while True:
-        try:
-            text = session.prompt("> ")
-        except KeyboardInterrupt:
-            continue
-        except EOFError:
-            break
-        if not text.strip():
-            continue
-            
-        if text.startswith("/"):
-            cmd = text.strip().split(maxsplit=1)
-            base_cmd = cmd[0]
-            
-            if base_cmd == "/help":
-                print_help()
-                continue
-                
-            elif base_cmd == "/settings":
-                display_settings(config)
-                continue
-                
-            elif base_cmd == "/reset":
-                config = reset_settings()
-                console.print("[green]All settings have been reset to default values.[/green]")
-                display_settings(config)
-                continue
-                
-            elif base_cmd == "/context_size":
-                if len(cmd) != 2:
-                    console.print("[green]Usage: /context_size <number>[/green]")
-                    continue
-                try:
-                    new_size = int(cmd[1])
-                    config["context_size"] = new_size
-                    save_config(config)
-                    console.print(f"[green]Context size set to {new_size}.[/green]")
-                except ValueError:
-                    console.print("[green]Invalid context size number.[/green]")
-                continue
-                
-            elif base_cmd == "/set_system_prompt":
-                if len(cmd) != 2:
-                    console.print("[green]Usage: /set_system_prompt <text>[/green]")
-                    continue
-                new_prompt = cmd[1].strip()
-                config["system_prompt"] = new_prompt
-                save_config(config)
-                console.print(f"[green]System prompt set to: {new_prompt}[/green]")
-                
-                if context and context[0].get("role") == "system":
-                    context[0]["content"] = new_prompt
-                else:
-                    context.insert(0, {"role": "system", "content": new_prompt})
-                continue
-                
-            elif base_cmd == "/set_top_p":
-                if len(cmd) != 2:
-                    console.print("[green]Usage: /set_top_p <number>[/green]")
-                    continue
-                try:
-                    new_value = float(cmd[1])
-                    if new_value <= 0 or new_value > 1:
-                        console.print("[green]top_p must be between 0 and 1[/green]")
-                        continue
-                    config["top_p"] = new_value
-                    save_config(config)
-                    console.print(f"[green]top_p set to {new_value}.[/green]")
-                except ValueError:
-                    console.print("[green]Invalid number.[/green]")
-                continue
-                
-            elif base_cmd == "/set_top_k":
-                if len(cmd) != 2:
-                    console.print("[green]Usage: /set_top_k <number>[/green]")
-                    continue
-                try:
-                    new_value = int(cmd[1])
-                    if new_value <= 0:
-                        console.print("[green]top_k must be greater than 0[/green]")
-                        continue
-                    config["top_k"] = new_value
-                    save_config(config)
-                    console.print(f"[green]top_k set to {new_value}.[/green]")
-                except ValueError:
-                    console.print("[green]Invalid number.[/green]")
-                continue
-                
-            elif base_cmd == "/set_temperature":
-                if len(cmd) != 2:
-                    console.print("[green]Usage: /set_temperature <number>[/green]")
-                    continue
-                try:
-                    new_value = float(cmd[1])
-                    if new_value < 0:
-                        console.print("[green]temperature must be non-negative[/green]")
-                        continue
-                    config["temperature"] = new_value
-                    save_config(config)
-                    console.print(f"[green]temperature set to {new_value}.[/green]")
-                except ValueError:
-                    console.print("[green]Invalid number.[/green]")
-                continue
-                
-            elif base_cmd == "/history":
-                loaded_history, loaded_context, filename = view_history_sessions()
-                if loaded_history is not None and loaded_context is not None:
-                    current_history_file = filename
-                    session_history = loaded_history
-                    context = loaded_context
-                    clear_screen()
-                    console.print("[green]Session loaded. You can continue the conversation.[/green]\n")
-                    for role, msg in session_history:
-                        console.print(format_history_line(role, msg))
-                    console.print("")
-                continue
-                
-            elif base_cmd == "/clear":
-                session_history = []
-                context = []
-                clear_screen()
-                display_settings(config)
-                console.print("[green]Type [yellow]/help[/yellow] to see available commands.[/green]")
-                console.print("[green]Chat cleared.[/green]")
-                continue
-                
-            elif base_cmd == "/exit":
-                break
-                
-            elif base_cmd == "/toggle_history":
-                config["history"] = not config.get("history", True)
-                save_config(config)
-                state = "enabled" if config["history"] else "disabled"
-                console.print(f"[green]History has been {state}.[/green]")
-                continue
-                
-            elif base_cmd == "/toggle_search":
-                config["search"] = not config.get("search", True)
-                save_config(config)
-                state = "enabled" if config["search"] else "disabled"
-                console.print(f"[green]Internet search has been {state}.[/green]")
-                continue
-                
-            elif base_cmd == "/toggle_search_mode":
-                current_mode = config.get("search_mode", "auto")
-                new_mode = "manual" if current_mode == "auto" else "auto"
-                config["search_mode"] = new_mode
-                save_config(config)
-                console.print(f"[green]Search mode has been changed to: {new_mode}.[/green]")
-                continue
-                
-            elif base_cmd == "/search_count":
-                if len(cmd) < 2:
-                    console.print("[green]Usage: /search_count <number>[/green]")
-                else:
-                    try:
-                        count = int(cmd[1])
-                        if count <= 0:
-                            raise ValueError
-                        config["search_count"] = count
-                        save_config(config)
-                        console.print(f"[green]Search result count set to {count}.[/green]")
-                    except ValueError:
-                        console.print("[green]Invalid number provided.[/green]")
-                continue
-                
-            elif base_cmd == "/search_amount":
-                if len(cmd) < 2:
-                    console.print("[green]Usage: /search_amount <number>[/green]")
-                else:
-                    try:
-                        amount = int(cmd[1])
-                        if amount <= 0:
-                            raise ValueError
-                        config["search_amount"] = amount
-                        save_config(config)
-                        console.print(f"[green]Search result word amount set to {amount} words per result.[/green]")
-                    except ValueError:
-                        console.print("[green]Invalid number provided.[/green]")
-                continue
-                
-            elif base_cmd == "/change_model":
-                model = select_model()
-                clear_screen()
-                display_settings(config)
-                console.print(f"[green]Model changed to: {model}[/green]")
-                continue
-                
-            elif base_cmd == "/toggle_deep_research":
-                DEEP_RESEARCH_ENABLED = not DEEP_RESEARCH_ENABLED
-                config["deep_research"] = DEEP_RESEARCH_ENABLED
-                save_config(config)
-                state = "enabled" if DEEP_RESEARCH_ENABLED else "disabled"
-                console.print(f"[green]Deep research mode has been {state}.[/green]")
-                continue
-                
-            elif base_cmd == "/deep_research_amount":
-                if len(cmd) < 2:
-                    console.print("[green]Usage: /deep_research_amount <number>[/green]")
-                else:
-                    try:
-                        amt = int(cmd[1])
-                        if amt < 1:
-                            raise ValueError
-                        DEEP_RESEARCH_AMOUNT = amt
-                        config["deep_research_amount"] = amt
-                        save_config(config)
-                        console.print(f"[green]Deep research iterations set to {amt}.[/green]")
-                    except ValueError:
-                        console.print("[green]Invalid number provided for deep research amount.[/green]")
-                continue
-                
-            else:
-                console.print("[green]Unknown command.[/green] Type [yellow]/help[/yellow] to see available commands.")
-                continue
-                
-        if DEEP_RESEARCH_ENABLED:
-            original_request = text.strip()
-            console.print("[green]Deep Research Mode is active[/green]")
-            
-            additional_details = start_deep_research(model, original_request, config)
-            
-            full_research_task = f"{original_request}"
-            if additional_details:
-                full_research_task += f" {additional_details}"
-                
-            combined_summary = ""
-            step_summaries = []
-            previous_queries = []
-            
-            # Perform research steps
-            for i in range(DEEP_RESEARCH_AMOUNT):
-                new_summary, query = perform_deep_research_step(
-                    model, 
-                    original_request, 
-                    additional_details, 
-                    combined_summary,
-                    previous_queries,
-                    i+1, 
-                    DEEP_RESEARCH_AMOUNT, 
-                    config
-                )
-                
-                previous_queries.append(query)
-                step_summaries.append(f"--- Step {i+1} Research ---\n{new_summary}")
-                
-                if combined_summary:
-                    combined_summary += "\n\n" + new_summary
-                else:
-                    combined_summary = new_summary
-                    
-            all_research = "\n\n".join(step_summaries)
-            
-            # Compile and display final answer
-            final_answer = compile_research_results(model, original_request, additional_details, all_research, config)
-            
-            # Add to conversation history
-            session_history.append(("User", original_request))
-            if additional_details:
-                session_history.append(("User Focus", additional_details))
-            session_history.append(("Research Summary", combined_summary))
-            session_history.append(("Assistant", final_answer))
-            
-            context.append({"role": "user", "content": original_request})
-            context.append({"role": "assistant", "content": final_answer})
-            
-        else:
-            session_history.append(("User", text))
-            context.append({"role": "user", "content": text})
-            
-            if config.get("search", True):
-                if config.get("search_mode", "auto") == "auto":
-                    if "</think>" in text:
-                        text = text.split("</think>")[-1].strip()
-                    if text.lower().startswith("search online"):
-                        text = text[len("search online"):].strip()
-                        
-                    generated_search_query = generate_search_query(text, model, config)
-                    generated_search_query = generated_search_query.splitlines()[0].strip()
-                    generated_search_query = generated_search_query.replace("<think>", "").strip()
-                    
-                    if not generated_search_query:
-                        generated_search_query = text
-                        
-                    console.print(f"[green]Generated search query:[/green] {generated_search_query}")
-                    
-                    search_result = search_duckduckgo(
-                        generated_search_query,
-                        max_results=config.get("search_count", 2),
-                        search_amount=config.get("search_amount", 500)
-                    )
-                    
-                    urls = []
-                    for line in search_result.splitlines():
-                        if "Link:" in line:
-                            url = line.split("Link:")[-1].strip()
-                            urls.append(url)
-                            
-                    if urls:
-                        urls_str = "\n" + "\n".join(f"- {url}" for url in urls)
-                        console.print(f"[green]Online Search URLs:[/green]\n{urls_str}\n")
-                    
-                    current_date = datetime.datetime.now().strftime("%Y-%m-%d")
-                    refined_prompt = (
-                        f"Current Date: {current_date}. Search Query: {generated_search_query}. "
-                        f"IMPORTANT: Answer using only the information provided in the search results below. Do not include any extraneous commentary or speculation. "
-                        f"Online search results for '{generated_search_query}': {search_result} "
-                        f"Based on these findings, please address the following inquiry: {text}"
-                    )
-                    
-                    refined_prompt = " ".join(refined_prompt.split())
-                    text = refined_prompt
-                    context[-1] = {"role": "user", "content": text}
-                    
-                elif config.get("search_mode", "auto") == "manual":
-                    match = re.search(r'search\s*"([^"]+)"', text)
-                    if match:
-                        query = match.group(1)
-                        search_result = search_duckduckgo(
-                            query,
-                            max_results=config.get("search_count", 2),
-                            search_amount=config.get("search_amount", 500)
-                        )
-                        
-                        text = re.sub(r'search\s*"[^"]+"', "", text).strip()
-                        if not text:
-                            refined_prompt = f"A web search was performed; results: {search_result}. No additional query provided."
-                        else:
-                            refined_prompt = f"A web search was performed; results: {search_result}. Please answer the user's query using these results: {text}"
-                            
-                        urls = []
-                        for line in search_result.splitlines():
-                            if "Link:" in line:
-                                parts = line.split("Link:")
-                                if len(parts) > 1:
-                                    url = parts[1].strip()
-                                    urls.append(url)
-                                    
-                        if urls:
-                            urls_str = "\n" + "\n".join(f"- {url}" for url in urls)
-                            console.print(f"[green]Online Search URLs:[/green]\n{urls_str}\n")
-                        
-                        text = " ".join(refined_prompt.split())
-                        context[-1] = {"role": "user", "content": text}
-                        
-            response_text = send_message(model, context, text, config=config)
-            response_text = transform_stars(response_text)
-            session_history.append(("Assistant", response_text))
-            context.append({"role": "assistant", "content": response_text})
-            
-    save_chat_session(session_history, CONFIG)
-
-def transform_stars(text):
-    return text.replace("*", "★")
+    try:
+        asyncio.run(Repl(chat, session).run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        save_chat_session(chat.history, CONFIG)
+        engine_loop.close()
+        client.close()
+        search_cache.close()
 
 if __name__ == "__main__":
     check_dependencies()
-    main()
\ No newline at end of file
+    main()
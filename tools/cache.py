@@ -0,0 +1,179 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from api.ndjson import dumps, loads
+
+BASE_DIR = os.path.join(os.path.expanduser("~"), "ollumar", "data")
+CACHE_PATH = os.path.join(BASE_DIR, "cache", "search.db")
+LAYERS = ("queries", "pages", "responses")
+DEFAULT_TTL_HOURS = 24
+DEFAULT_SIZE_MB = 50
+
+def query_key(query, max_results):
+    words = sorted(set(re.findall(r"\w+", query.lower())))
+    return f"{max_results}:{' '.join(words)}"
+
+class SearchCache:
+    def __init__(self, path=CACHE_PATH, ttl_hours=DEFAULT_TTL_HOURS, size_mb=DEFAULT_SIZE_MB):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = int(size_mb * 1024 * 1024)
+        self.enabled = True
+        self.responses_enabled = False
+        self.lock = threading.Lock()
+        self.db = None
+        self.session = {layer: {"hits": 0, "misses": 0, "revalidated": 0} for layer in LAYERS}
+
+    def configure(self, config):
+        self.enabled = config.get("search_cache", True)
+        self.responses_enabled = config.get("response_cache", False)
+        self.ttl = config.get("cache_ttl", DEFAULT_TTL_HOURS) * 3600
+        self.max_bytes = int(config.get("cache_size", DEFAULT_SIZE_MB) * 1024 * 1024)
+
+    def _connect(self):
+        if self.db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "layer TEXT, key TEXT, value TEXT, size INTEGER, created REAL, accessed REAL, "
+                "PRIMARY KEY (layer, key))"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS counters (layer TEXT PRIMARY KEY, hits INTEGER, misses INTEGER)")
+            columns = [row[1] for row in self.db.execute("PRAGMA table_info(counters)")]
+            if "revalidated" not in columns:
+                self.db.execute("ALTER TABLE counters ADD COLUMN revalidated INTEGER DEFAULT 0")
+        return self.db
+
+    def _enabled(self, layer):
+        return self.responses_enabled if layer == "responses" else self.enabled
+
+    def _count(self, db, layer, column):
+        self.session[layer][column] = self.session[layer].get(column, 0) + 1
+        db.execute("INSERT OR IGNORE INTO counters (layer, hits, misses, revalidated) VALUES (?, 0, 0, 0)", (layer,))
+        db.execute(f"UPDATE counters SET {column} = {column} + 1 WHERE layer = ?", (layer,))
+
+    def _expires(self, value, created):
+        if isinstance(value, dict) and value.get("expires") is not None:
+            return value["expires"]
+        return created + self.ttl
+
+    def _expired(self, value, created, now):
+        return now >= self._expires(value, created) and not (isinstance(value, dict) and value.get("validators"))
+
+    def lookup(self, layer, key):
+        if not self._enabled(layer):
+            return None, False
+        now = time.time()
+        with self.lock:
+            try:
+                db = self._connect()
+                row = db.execute("SELECT value, created FROM entries WHERE layer = ? AND key = ?", (layer, key)).fetchone()
+                value = loads(row[0]) if row is not None else None
+                fresh = value is not None and now < self._expires(value, row[1])
+                if value is not None and self._expired(value, row[1], now):
+                    db.execute("DELETE FROM entries WHERE layer = ? AND key = ?", (layer, key))
+                    value = None
+                if value is not None:
+                    db.execute("UPDATE entries SET accessed = ? WHERE layer = ? AND key = ?", (now, layer, key))
+                if fresh:
+                    self._count(db, layer, "hits")
+                elif value is None:
+                    self._count(db, layer, "misses")
+            except sqlite3.Error:
+                return None, False
+        return value, fresh
+
+    def get(self, layer, key):
+        value, fresh = self.lookup(layer, key)
+        return value if fresh else None
+
+    def record(self, layer, column):
+        with self.lock:
+            try:
+                self._count(self._connect(), layer, column)
+            except sqlite3.Error:
+                pass
+
+    def revalidated(self, layer, key, value):
+        self.put(layer, key, value)
+        self.record(layer, "revalidated")
+
+    def put(self, layer, key, value):
+        if not self._enabled(layer):
+            return
+        data = dumps(value)
+        now = time.time()
+        with self.lock:
+            try:
+                db = self._connect()
+                db.execute(
+                    "INSERT OR REPLACE INTO entries (layer, key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                    (layer, key, data, len(data.encode("utf-8")), now, now)
+                )
+                self._evict(db)
+            except sqlite3.Error:
+                pass
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = db.execute("SELECT layer, key, size FROM entries ORDER BY accessed").fetchall()
+        for layer, key, size in rows:
+            if total <= self.max_bytes:
+                break
+            db.execute("DELETE FROM entries WHERE layer = ? AND key = ?", (layer, key))
+            total -= size
+
+    def purge(self, layer=None, expired_only=False):
+        with self.lock:
+            db = self._connect()
+            clauses, params = [], []
+            if layer is not None:
+                clauses.append("layer = ?")
+                params.append(layer)
+            where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+            if expired_only:
+                now = time.time()
+                rows = db.execute(f"SELECT layer, key, value, created FROM entries{where}", params).fetchall()
+                expired = [(row[0], row[1]) for row in rows if self._expired(loads(row[2]), row[3], now)]
+                db.executemany("DELETE FROM entries WHERE layer = ? AND key = ?", expired)
+                removed = len(expired)
+            else:
+                removed = db.execute(f"DELETE FROM entries{where}", params).rowcount
+                db.execute("DELETE FROM counters" + (" WHERE layer = ?" if layer else ""), [layer] if layer else [])
+            db.execute("VACUUM")
+        return removed
+
+    def stats(self):
+        with self.lock:
+            db = self._connect()
+            stats = {}
+            for layer in LAYERS:
+                entries, size = db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE layer = ?", (layer,)
+                ).fetchone()
+                counters = db.execute("SELECT hits, misses, revalidated FROM counters WHERE layer = ?", (layer,)).fetchone() or (0, 0, 0)
+                stats[layer] = {
+                    "entries": entries,
+                    "bytes": size,
+                    "hits": counters[0],
+                    "misses": counters[1],
+                    "revalidated": counters[2] or 0,
+                    "session_hits": self.session[layer]["hits"],
+                    "session_misses": self.session[layer]["misses"],
+                }
+        return stats
+
+    def close(self):
+        with self.lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
+
+search_cache = SearchCache()
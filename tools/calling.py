@@ -0,0 +1,92 @@
+import asyncio
+import datetime
+import json
+import time
+from rich.console import Console
+from tools.search import search_duckduckgo, fetch_page_text
+from tools.fetch import public_url
+from ui.events import events
+from utils.aio import run_blocking
+
+console = Console()
+
+MAX_TOOL_ROUNDS = 3
+
+def tool_specs():
+    current_date = datetime.datetime.now().strftime("%Y-%m-%d")
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": "web_search",
+                "description": (
+                    "Search the web with DuckDuckGo and return the most relevant passages from the top results. "
+                    f"Use it for recent events, facts you are unsure about, or anything that may have changed. Today is {current_date}."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "query": {"type": "string", "description": "A short search query"}
+                    },
+                    "required": ["query"]
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "fetch_page",
+                "description": "Download a web page and return its main text. Use it to read a link from the search results or one the user gave.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "url": {"type": "string", "description": "The full http or https URL of the page"}
+                    },
+                    "required": ["url"]
+                }
+            }
+        }
+    ]
+
+def call_arguments(call):
+    arguments = call.get("function", {}).get("arguments", {})
+    if isinstance(arguments, str):
+        try:
+            arguments = json.loads(arguments)
+        except ValueError:
+            arguments = {}
+    return arguments if isinstance(arguments, dict) else {}
+
+async def run_tool(call, config, token=None, focus=None, dedup=None):
+    name = call.get("function", {}).get("name", "")
+    arguments = call_arguments(call)
+    started = time.monotonic()
+    events.emit("tool_call", name=name, arguments=arguments)
+    if name == "web_search" and str(arguments.get("query", "")).strip():
+        query = str(arguments["query"]).strip()
+        console.print(f"[green]Model searched for:[/green] {query}")
+        result = await search_duckduckgo(
+            query,
+            max_results=config.get("search_count", 2),
+            token=token,
+            config=config,
+            focus=focus,
+            dedup=dedup
+        )
+        result = result or "The search returned no results."
+    elif name == "fetch_page" and str(arguments.get("url", "")).startswith(("http://", "https://")):
+        url = arguments["url"]
+        if await run_blocking(public_url, url):
+            console.print(f"[green]Model is reading:[/green] {url}")
+            result = await run_blocking(fetch_page_text, url, "", config.get("search_amount", 500), token, config.get("html_backend", "auto"), True)
+            result = result or "The page could not be read."
+        else:
+            console.print(f"[yellow]Refused to read a non-public address:[/yellow] {url}")
+            result = "Only pages on the public internet can be read; this URL points to a local or private address."
+    else:
+        result = f"Unknown tool '{name}' or missing arguments."
+    events.emit("tool_result", name=name, chars=len(result), seconds=round(time.monotonic() - started, 3))
+    return {"role": "tool", "content": result, "tool_name": name}
+
+async def run_tool_calls(calls, config, token=None, focus=None, dedup=None):
+    return list(await asyncio.gather(*(run_tool(call, config, token=token, focus=focus, dedup=dedup) for call in calls)))
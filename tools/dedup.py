@@ -0,0 +1,70 @@
+import hashlib
+import random
+import re
+import threading
+
+TOKEN = re.compile(r"\w+")
+DEFAULT_THRESHOLD = 0.6
+NUM_PERM = 32
+BANDS = 8
+SHINGLE_WORDS = 3
+
+def shingle_hashes(text, size=SHINGLE_WORDS):
+    words = TOKEN.findall(text.lower())
+    if not words:
+        return set()
+    if len(words) < size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return {int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big") for shingle in shingles}
+
+class MinHashFilter:
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM, bands=BANDS, seed=1):
+        rng = random.Random(seed)
+        self.threshold = threshold
+        self.masks = [rng.getrandbits(64) for _ in range(num_perm)]
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = []
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def signature(self, text):
+        hashes = shingle_hashes(text)
+        if not hashes:
+            return None
+        return tuple(min([value ^ mask for value in hashes]) for mask in self.masks)
+
+    def similarity(self, first, second):
+        return sum(a == b for a, b in zip(first, second)) / len(first)
+
+    def _bands(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def is_duplicate(self, signature):
+        candidates = set()
+        for band, key in self._bands(signature):
+            candidates.update(self.buckets[band].get(key, ()))
+        return any(self.similarity(signature, self.signatures[index]) >= self.threshold for index in candidates)
+
+    def add(self, signature):
+        index = len(self.signatures)
+        self.signatures.append(signature)
+        for band, key in self._bands(signature):
+            self.buckets[band].setdefault(key, []).append(index)
+
+    def seen(self, text):
+        if self.threshold <= 0:
+            return False
+        signature = self.signature(text)
+        if signature is None:
+            return False
+        with self.lock:
+            if self.is_duplicate(signature):
+                self.dropped += 1
+                return True
+            self.add(signature)
+        return False
@@ -0,0 +1,239 @@
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+Block = namedtuple("Block", ["text", "link_chars", "chain", "hint"])
+
+HIDDEN_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "head", "select", "button"}
+INLINE_TAGS = {"a", "abbr", "b", "bdi", "bdo", "cite", "code", "data", "dfn", "em", "font", "i", "kbd", "label", "mark", "q", "s", "samp", "small", "span", "strong", "sub", "sup", "time", "u", "var", "wbr"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+CONTAINER_TAGS = {"article", "body", "div", "main", "section", "table", "tbody", "td", "ol", "ul", "blockquote", "form", "aside", "nav", "header", "footer"}
+IMPLICIT_CLOSE = {"p", "li", "dt", "dd", "tr", "td", "th", "option"}
+POSITIVE_TAGS = {"article", "main"}
+NEGATIVE_TAGS = {"nav", "footer", "header", "aside", "form", "menu", "dialog"}
+POSITIVE_HINTS = re.compile(r"article|body|content|entry|main|page|post|text|blog|story", re.IGNORECASE)
+NEGATIVE_HINTS = re.compile(
+    r"ad-|advert|banner|breadcrumb|comment|consent|cookie|footer|gdpr|header|masthead|menu|modal|"
+    r"nav|newsletter|popup|promo|related|share|sidebar|skip|social|sponsor|subscribe|widget",
+    re.IGNORECASE
+)
+HINT_BONUS = 3
+MIN_BLOCK_CHARS = 25
+MIN_CONTENT_WORDS = 50
+MAX_LINK_DENSITY = 0.5
+
+def element_hint(tag, classes):
+    if tag in NEGATIVE_TAGS:
+        return -1
+    if classes:
+        if NEGATIVE_HINTS.search(classes):
+            return -1
+        if POSITIVE_HINTS.search(classes):
+            return 1
+    if tag in POSITIVE_TAGS:
+        return 1
+    return 0
+
+class BlockBuilder:
+    def __init__(self):
+        self.stack = []
+        self.blocks = []
+        self.parts = []
+        self.link_chars = 0
+        self.links = 0
+        self.hidden = 0
+        self.next_key = 0
+
+    def start(self, tag, classes=""):
+        if tag in VOID_TAGS:
+            if tag in ("br", "hr"):
+                self.parts.append(" ")
+            return
+        if tag in IMPLICIT_CLOSE and self.stack and self.stack[-1][0] == tag:
+            self.end(tag)
+        if tag not in INLINE_TAGS:
+            self.flush()
+        self.stack.append((tag, self.next_key, element_hint(tag, classes)))
+        self.next_key += 1
+        if tag in HIDDEN_TAGS:
+            self.hidden += 1
+        elif tag == "a":
+            self.links += 1
+
+    def end(self, tag):
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                break
+        else:
+            return
+        while len(self.stack) > index:
+            closed = self.stack[-1][0]
+            if closed not in INLINE_TAGS:
+                self.flush()
+            self.stack.pop()
+            if closed in HIDDEN_TAGS:
+                self.hidden -= 1
+            elif closed == "a":
+                self.links -= 1
+
+    def text(self, data):
+        if self.hidden or not data:
+            return
+        self.parts.append(data)
+        if self.links:
+            self.link_chars += len(data.strip())
+
+    def flush(self):
+        text = " ".join("".join(self.parts).split())
+        if text:
+            chain = tuple(key for tag, key, _ in self.stack if tag in CONTAINER_TAGS)
+            hint = next((hint for _, _, hint in reversed(self.stack) if hint), 0)
+            self.blocks.append(Block(text, self.link_chars, chain, hint))
+        self.parts = []
+        self.link_chars = 0
+
+    def close(self):
+        self.flush()
+        return self.blocks
+
+class StdlibWalker(HTMLParser):
+    def __init__(self, builder):
+        super().__init__(convert_charrefs=True)
+        self.builder = builder
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        self.builder.start(tag, f"{attrs.get('class') or ''} {attrs.get('id') or ''}")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.builder.end(tag)
+
+    def handle_endtag(self, tag):
+        self.builder.end(tag)
+
+    def handle_data(self, data):
+        self.builder.text(data)
+
+def stdlib_blocks(html):
+    builder = BlockBuilder()
+    walker = StdlibWalker(builder)
+    walker.feed(html)
+    walker.close()
+    return builder.close()
+
+def lxml_blocks(html):
+    from lxml import etree
+    from lxml import html as lxml_html
+    builder = BlockBuilder()
+    html = re.sub(r"^\s*<\?xml[^>]*\?>", "", html)
+    if not html.strip():
+        return builder.close()
+    root = lxml_html.document_fromstring(html)
+    for action, element in etree.iterwalk(root, events=("start", "end")):
+        tag = element.tag if isinstance(element.tag, str) else None
+        if action == "start":
+            if tag is not None:
+                builder.start(tag.lower(), f"{element.get('class') or ''} {element.get('id') or ''}")
+                builder.text(element.text)
+        else:
+            if tag is not None:
+                builder.end(tag.lower())
+            builder.text(element.tail)
+    return builder.close()
+
+def selectolax_blocks(html):
+    from selectolax.lexbor import LexborHTMLParser
+    builder = BlockBuilder()
+    root = LexborHTMLParser(html).root
+    stack = [(root, False)] if root is not None else []
+    while stack:
+        node, closing = stack.pop()
+        tag = node.tag
+        if closing:
+            builder.end(tag)
+            continue
+        if tag == "-text":
+            builder.text(node.text(deep=False))
+            continue
+        if tag.startswith("-") or tag.startswith("_"):
+            continue
+        attributes = node.attributes
+        builder.start(tag, f"{attributes.get('class') or ''} {attributes.get('id') or ''}")
+        stack.append((node, True))
+        stack.extend((child, False) for child in reversed(list(node.iter(include_text=True))))
+    return builder.close()
+
+BACKENDS = {
+    "selectolax": ("selectolax.lexbor", selectolax_blocks),
+    "lxml": ("lxml.html", lxml_blocks),
+    "html.parser": ("html.parser", stdlib_blocks),
+}
+BACKEND_ORDER = ["selectolax", "lxml", "html.parser"]
+_available = {}
+
+def backend_available(name):
+    if name not in _available:
+        try:
+            __import__(BACKENDS[name][0])
+            _available[name] = True
+        except ImportError:
+            _available[name] = False
+    return _available[name]
+
+def available_backends():
+    return [name for name in BACKEND_ORDER if backend_available(name)]
+
+def resolve_backend(name="auto"):
+    if name in BACKENDS and backend_available(name):
+        return name
+    available = available_backends()
+    return available[0] if available else "html.parser"
+
+def block_score(block):
+    if len(block.text) < MIN_BLOCK_CHARS:
+        return 0
+    density = link_density(block)
+    score = 1 + block.text.count(",") + min(len(block.text) / 100, 3)
+    return score * (1 - density) + block.hint * HINT_BONUS
+
+def link_density(block):
+    return min(1.0, block.link_chars / max(1, len(block.text)))
+
+def select_main_content(blocks):
+    scores = {}
+    for block in blocks:
+        score = block_score(block)
+        if score <= 0 or not block.chain:
+            continue
+        scores[block.chain[-1]] = scores.get(block.chain[-1], 0) + score
+        if len(block.chain) > 1:
+            scores[block.chain[-2]] = scores.get(block.chain[-2], 0) + score / 2
+    if not scores:
+        return []
+    best = max(scores, key=scores.get)
+    return [
+        block for block in blocks
+        if best in block.chain and block.hint >= 0 and link_density(block) <= MAX_LINK_DENSITY
+    ]
+
+def take_words(blocks, max_words):
+    words = []
+    for block in blocks:
+        words.extend(block.text.split())
+        if len(words) >= max_words:
+            break
+    return " ".join(words[:max_words])
+
+def extract_text(html, max_words, backend="auto", main_content=True):
+    blocks = BACKENDS[resolve_backend(backend)][1](html)
+    if main_content:
+        content = select_main_content(blocks)
+        if sum(len(block.text.split()) for block in content) >= min(max_words, MIN_CONTENT_WORDS):
+            return take_words(content, max_words)
+        readable = [block for block in blocks if block.hint >= 0 and link_density(block) <= MAX_LINK_DENSITY]
+        text = take_words(readable, max_words)
+        if text:
+            return text
+    return take_words(blocks, max_words)
@@ -0,0 +1,170 @@
+import codecs
+import ipaddress
+import re
+import socket
+import time
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+CHUNK_SIZE = 16 * 1024
+BYTES_PER_WORD = 512
+MIN_PAGE_BYTES = 128 * 1024
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+WORD_HEADROOM = 3
+POOL_WORDS = MAX_PAGE_BYTES // BYTES_PER_WORD
+TEXT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w.:-]+)""", re.IGNORECASE)
+
+def page_byte_limit(search_amount):
+    return min(MAX_PAGE_BYTES, max(MIN_PAGE_BYTES, search_amount * BYTES_PER_WORD))
+
+def public_url(url):
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return False
+    try:
+        addresses = socket.getaddrinfo(parts.hostname, parts.port or None, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError, ValueError):
+        return False
+    return bool(addresses) and all(ipaddress.ip_address(address[4][0].split("%")[0]).is_global for address in addresses)
+
+def refuse_private_redirects(response, *args, **kwargs):
+    if response.is_redirect and not public_url(urljoin(response.url, response.headers.get("Location", ""))):
+        response.close()
+        raise ValueError(f"Refusing to follow a redirect from {response.url} to a non-public address")
+
+def is_text_page(content_type):
+    media_type = content_type.split(";")[0].strip().lower()
+    return not media_type or media_type in TEXT_TYPES
+
+def declared_length(headers):
+    try:
+        return int(headers.get("Content-Length", ""))
+    except ValueError:
+        return None
+
+def response_validators(headers):
+    validators = {}
+    if headers.get("ETag"):
+        validators["etag"] = headers["ETag"]
+    if headers.get("Last-Modified"):
+        validators["last_modified"] = headers["Last-Modified"]
+    return validators
+
+def conditional_headers(validators):
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+def freshness(headers, now=None):
+    now = time.time() if now is None else now
+    directives = {}
+    for directive in headers.get("Cache-Control", "").lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name] = value.strip('"')
+    if "no-store" in directives:
+        return False, None
+    if "no-cache" in directives:
+        return True, now
+    if "max-age" in directives:
+        try:
+            return True, now + max(0, int(directives["max-age"]) - age_header(headers))
+        except ValueError:
+            pass
+    if headers.get("Expires"):
+        try:
+            return True, parsedate_to_datetime(headers["Expires"]).timestamp()
+        except (TypeError, ValueError):
+            return True, now
+    return True, None
+
+def age_header(headers):
+    try:
+        return max(0, int(headers.get("Age", 0)))
+    except ValueError:
+        return 0
+
+def valid_charset(name):
+    try:
+        return codecs.lookup(name.strip().strip("\"'")).name
+    except (LookupError, AttributeError):
+        return None
+
+def sniff_charset(content_type, head):
+    for bom, name in ((codecs.BOM_UTF8, "utf-8"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16")):
+        if head.startswith(bom):
+            return name
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            charset = valid_charset(value)
+            if charset:
+                return charset
+    match = META_CHARSET.search(head[:4096])
+    if match:
+        charset = valid_charset(match.group(1).decode("ascii", errors="ignore"))
+        if charset:
+            return charset
+    return "utf-8"
+
+class VisibleWordCounter(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.words = 0
+        self.hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style", "noscript"):
+            self.hidden += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style", "noscript") and self.hidden:
+            self.hidden -= 1
+
+    def handle_data(self, data):
+        if not self.hidden:
+            self.words += len(data.split())
+
+class PageReader:
+    def __init__(self, response, search_amount):
+        self.response = response
+        self.search_amount = search_amount
+        self.content_type = response.headers.get("Content-Type", "")
+        self.length = declared_length(response.headers)
+        self.encoded = response.headers.get("Content-Encoding", "identity").strip().lower() not in ("", "identity")
+        self.limit = page_byte_limit(search_amount)
+        if self.length is not None and not self.encoded:
+            self.limit = min(self.limit, self.length)
+        self.bytes_read = 0
+        self.charset = None
+        self.truncated = False
+
+    def acceptable(self):
+        return is_text_page(self.content_type) and self.length != 0
+
+    def read(self):
+        counter = VisibleWordCounter()
+        decoder = None
+        parts = []
+        wanted = self.search_amount * WORD_HEADROOM
+        for chunk in self.response.iter_content(chunk_size=CHUNK_SIZE):
+            if not chunk:
+                continue
+            chunk = chunk[:self.limit - self.bytes_read]
+            self.bytes_read += len(chunk)
+            if decoder is None:
+                self.charset = sniff_charset(self.content_type, chunk)
+                decoder = codecs.getincrementaldecoder(self.charset)(errors="replace")
+            text = decoder.decode(chunk)
+            parts.append(text)
+            counter.feed(text)
+            if counter.words >= wanted or self.bytes_read >= self.limit:
+                self.truncated = self.encoded or self.length is None or self.bytes_read < self.length
+                break
+        if decoder is not None:
+            parts.append(decoder.decode(b"", final=True))
+        return "".join(parts)
@@ -0,0 +1,117 @@
+import datetime
+import math
+import re
+from api.lifecycle import CancelToken, Cancelled
+from chat.messaging import send_message
+
+DEFAULT_THRESHOLD = 0.5
+PROBE_MARGIN = 0.2
+PROBE_WEIGHT = 2.0
+PROBE_TIMEOUT = 15
+
+SMALL_TALK = re.compile(r"^(thanks?( you)?|thank you( so much| very much)?|thx|ty|ok(ay)?|cool|great|nice|perfect|awesome|got it|sure|yes|no|yep|nope|hi|hello|hey|bye|goodbye|good (morning|night)|lol|wow|makes sense)( [a-z]+)?[\s!.,:)]*$", re.I)
+FOLLOW_UP = re.compile(r"^(re-?write|rephrase|shorten|summari[sz]e|translate|simplify|expand|elaborate|continue|format|fix|reword|proofread|make (it|that|this)|turn (it|that|this)|convert|now|and|also|again|(can|could) you (re-?write|make|shorten|summari[sz]e|translate|explain|format|expand|simplify))\b", re.I)
+ANAPHORA = re.compile(r"\b(that|this|it|above|previous|your answer|the answer|last one|you said)\b", re.I)
+FRESHNESS = re.compile(r"\b(latest|newest|current(ly)?|today|tonight|yesterday|tomorrow|this (week|month|year)|recent(ly)?|news|right now|update[ds]?|release[ds]?|prices?|cost|stocks?|weather|scores?|schedule|version|forecast|election)\b", re.I)
+LOOKUP = re.compile(r"^(who|what|when|where|which|how (much|many|old|long|far|to)|is there|are there|does|did|list|find|search|look up|compare)\b", re.I)
+CREATIVE = re.compile(r"^(write|create|generate|compose|draft|brainstorm|imagine|pretend|role-?play|tell me a (joke|story)|give me (an? )?(idea|name|example)s?)\b", re.I)
+CODE = re.compile(r"```|\bdef \w+\(|\bclass \w+|\bfunction\b|=>|\bimport \w+|\b\d+\s*[-+*/^]\s*\d+\b")
+URL = re.compile(r"https?://|www\.", re.I)
+YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+
+WEIGHTS = {
+    "bias": 0.3,
+    "small talk": -4.0,
+    "follow-up instruction": -2.0,
+    "refers to the previous answer": -1.0,
+    "time-sensitive wording": 1.8,
+    "factual question": 1.2,
+    "question": 0.5,
+    "names": 0.4,
+    "recent year": 1.5,
+    "link": 0.8,
+    "creative task": -1.0,
+    "code or arithmetic": -1.5,
+    "very short": -1.0,
+    "long pasted text": -1.2,
+}
+
+def features(text, has_history=False):
+    words = text.split()
+    current_year = datetime.datetime.now().year
+    names = sum(1 for word in words[1:] if word[:1].isupper() and word[1:2].islower())
+    return {
+        "bias": 1,
+        "small talk": 1 if SMALL_TALK.match(text) else 0,
+        "follow-up instruction": 1 if has_history and FOLLOW_UP.match(text) else 0,
+        "refers to the previous answer": 1 if has_history and len(words) <= 12 and ANAPHORA.search(text) else 0,
+        "time-sensitive wording": 1 if FRESHNESS.search(text) else 0,
+        "factual question": 1 if LOOKUP.match(text) else 0,
+        "question": 1 if "?" in text else 0,
+        "names": min(names, 3),
+        "recent year": 1 if any(int(year) >= current_year - 1 for year in YEAR.findall(text)) else 0,
+        "link": 1 if URL.search(text) else 0,
+        "creative task": 1 if CREATIVE.match(text) else 0,
+        "code or arithmetic": 1 if CODE.search(text) else 0,
+        "very short": 1 if len(words) <= 3 and "?" not in text else 0,
+        "long pasted text": 1 if len(words) > 80 else 0,
+    }
+
+def probe_search(text, model, config, token=None):
+    prompt = (
+        "Reply with only yes or no. Does answering the following message require searching the web "
+        f"for current or factual information? Message: {text}"
+    )
+    call = token.child(timeout=PROBE_TIMEOUT) if token else CancelToken(timeout=PROBE_TIMEOUT)
+    try:
+        answer = send_message(
+            model,
+            [{"role": "user", "content": prompt}],
+            prompt,
+            suppress_output=True,
+            config=config,
+            token=call,
+            profile="gate_probe"
+        ).strip().lower()
+        if answer.startswith("yes"):
+            return True
+        if answer.startswith("no"):
+            return False
+        return None
+    except Cancelled:
+        if token is not None:
+            token.check()
+        return None
+    except Exception:
+        return None
+    finally:
+        call.close()
+
+def decide_search(text, model, config, has_history=False, token=None):
+    text = text.strip()
+    if text.lower().startswith("search online"):
+        return {"search": True, "confidence": 1.0, "reason": "explicit request", "probed": False}
+    values = features(text, has_history)
+    contributions = {name: WEIGHTS[name] * value for name, value in values.items() if value}
+    score = sum(contributions.values())
+    probability = 1 / (1 + math.exp(-score))
+    probed = False
+    if config.get("gate_probe", False) and abs(probability - 0.5) < PROBE_MARGIN:
+        answer = probe_search(text, model, config, token=token)
+        if answer is not None:
+            probed = True
+            contributions["model probe"] = PROBE_WEIGHT if answer else -PROBE_WEIGHT
+            score += contributions["model probe"]
+            probability = 1 / (1 + math.exp(-score))
+    search = probability >= config.get("gate_threshold", DEFAULT_THRESHOLD)
+    reasons = sorted(
+        (name for name in contributions if name != "bias" and (contributions[name] > 0) == search),
+        key=lambda name: abs(contributions[name]),
+        reverse=True
+    )
+    return {
+        "search": search,
+        "confidence": round(probability if search else 1 - probability, 3),
+        "reason": ", ".join(reasons[:2]) or ("no reason to skip" if search else "nothing to look up"),
+        "probed": probed,
+    }
@@ -0,0 +1,140 @@
+import re
+import threading
+import time
+
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 3
+MIN_RATE_FACTOR = 0.1
+RECOVERY_FACTOR = 0.1
+FIRST_BACKOFF = 2
+MAX_BACKOFF = 60
+FAILURE_THRESHOLD = 3
+RESET_AFTER = 60
+RATE_LIMIT_STATUS = re.compile(r"\b(202|429)\b")
+
+def is_rate_limit(error):
+    if type(error).__name__ == "RatelimitException":
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status in (202, 429):
+        return True
+    message = str(error).lower()
+    return "ratelimit" in message or "rate limit" in message or RATE_LIMIT_STATUS.search(message) is not None
+
+class SearchLimiter:
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, clock=time.monotonic):
+        self.clock = clock
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.blocked_until = 0.0
+        self.backoff = 0
+        self.lock = threading.Lock()
+
+    def configure(self, config):
+        with self.lock:
+            self.base_rate = max(0.01, config.get("search_rate", DEFAULT_RATE))
+            self.rate = min(self.rate, self.base_rate) if self.backoff else self.base_rate
+            self.capacity = max(1, config.get("search_burst", DEFAULT_BURST))
+            self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        with self.lock:
+            now = self.clock()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(0.0, self.blocked_until - now)
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+            return wait
+
+    def success(self):
+        with self.lock:
+            self.backoff = 0
+            self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_FACTOR)
+
+    def throttled(self):
+        with self.lock:
+            now = self.clock()
+            self._refill(now)
+            self.backoff = min(MAX_BACKOFF, self.backoff * 2 or FIRST_BACKOFF)
+            self.blocked_until = now + self.backoff
+            self.rate = max(self.base_rate * MIN_RATE_FACTOR, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            return self.backoff
+
+    def describe(self):
+        with self.lock:
+            self._refill(self.clock())
+            state = f"{self.rate:.2f} req/s, {max(0.0, self.tokens):.1f}/{self.capacity} ready"
+            blocked = self.blocked_until - self.clock()
+            if blocked > 0:
+                state += f", backing off {blocked:.0f}s"
+            return state
+
+class CircuitBreaker:
+    def __init__(self, threshold=FAILURE_THRESHOLD, reset_after=RESET_AFTER, clock=time.monotonic):
+        self.clock = clock
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened is None:
+            return "closed"
+        if self.clock() - self.opened >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def retry_in(self):
+        if self.opened is None:
+            return 0
+        return max(0, self.reset_after - (self.clock() - self.opened))
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened = None
+            self.probing = False
+
+    def release(self):
+        with self.lock:
+            self.probing = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                self.opened = self.clock()
+            self.probing = False
+
+    def describe(self):
+        state = self.state
+        if state == "open":
+            return f"open, retrying in {self.retry_in():.0f}s"
+        if self.failures:
+            return f"{state}, {self.failures} recent failure(s)"
+        return state
+
+search_limiter = SearchLimiter()
+search_breaker = CircuitBreaker()
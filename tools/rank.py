@@ -0,0 +1,98 @@
+import math
+import re
+from collections import Counter
+
+TOKEN = re.compile(r"\w+")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "how", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "this", "to", "was", "what", "when", "where", "which", "who",
+    "why", "will", "with", "you", "your", "do", "does", "can", "i", "me", "my", "we", "our", "about",
+}
+PASSAGE_WORDS = 60
+TOKENS_PER_WORD = 1.3
+
+def tokenize(text):
+    return [word for word in TOKEN.findall(text.lower()) if word not in STOPWORDS]
+
+def estimate_tokens(text):
+    return int(len(text.split()) * TOKENS_PER_WORD) + 1
+
+def split_passages(text, size=PASSAGE_WORDS):
+    passages = []
+    current = []
+    for sentence in SENTENCE_END.split(text):
+        words = sentence.split()
+        while len(words) > size * 2:
+            if current:
+                passages.append(" ".join(current))
+                current = []
+            passages.append(" ".join(words[:size]))
+            words = words[size:]
+        current.extend(words)
+        if len(current) >= size:
+            passages.append(" ".join(current))
+            current = []
+    if current:
+        if passages and len(current) < size // 3:
+            passages[-1] += " " + " ".join(current)
+        else:
+            passages.append(" ".join(current))
+    return passages
+
+class BM25:
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.frequencies = [Counter(document) for document in documents]
+        self.lengths = [len(document) for document in documents]
+        self.average = sum(self.lengths) / len(documents) if documents else 0
+        counts = Counter(term for frequency in self.frequencies for term in frequency)
+        total = len(documents)
+        self.idf = {term: math.log(1 + (total - count + 0.5) / (count + 0.5)) for term, count in counts.items()}
+
+    def score(self, query, index):
+        frequency = self.frequencies[index]
+        length = self.lengths[index]
+        score = 0.0
+        for term in query:
+            if term not in frequency:
+                continue
+            tf = frequency[term]
+            norm = tf + self.k1 * (1 - self.b + self.b * length / (self.average or 1))
+            score += self.idf[term] * tf * (self.k1 + 1) / norm
+        return score
+
+    def scores(self, query):
+        return [self.score(query, index) for index in range(len(self.frequencies))]
+
+def select_passages(pages, query, token_budget, dedup=None):
+    candidates = []
+    for page_index, text in enumerate(pages):
+        for passage_index, passage in enumerate(split_passages(text or "")):
+            candidates.append((page_index, passage_index, passage))
+    selected = [[] for _ in pages]
+    if not candidates:
+        return selected
+    index = BM25([tokenize(passage) for _, _, passage in candidates])
+    scores = index.scores(list(dict.fromkeys(tokenize(query))))
+    if any(scores):
+        order = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+        order = [i for i in order if scores[i] > 0]
+    else:
+        order = sorted(range(len(candidates)), key=lambda i: (candidates[i][1], candidates[i][0]))
+    used = 0
+    chosen = []
+    for i in order:
+        cost = estimate_tokens(candidates[i][2])
+        if used + cost > token_budget and chosen:
+            continue
+        if dedup is not None and dedup.seen(candidates[i][2]):
+            continue
+        chosen.append(i)
+        used += cost
+        if used >= token_budget:
+            break
+    for i in sorted(chosen, key=lambda i: (candidates[i][0], candidates[i][1])):
+        selected[candidates[i][0]].append(candidates[i][2])
+    return selected
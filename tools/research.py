@@ -3,11 +3,20 @@ import re
 from rich.console import Console
 from tools.search import search_duckduckgo
 from chat.messaging import send_message
+from chat.profiles import generation_profile
+from ui.events import events
+from utils.aio import run_blocking
 from utils.spinners import FancySpinner
 
 console = Console()
 
-def start_deep_research(model, original_request, config):
+async def ask_input(message):
+    console.print(message, end="")
+    return await run_blocking(input)
+
+async def start_deep_research(model, original_request, config, ask=ask_input, token=None):
+    if token is not None:
+        token.check()
     spinner = FancySpinner("Generating research focus questions")
     spinner.start()
     
@@ -17,8 +26,10 @@ def start_deep_research(model, original_request, config):
     )
     
     questions_context = [{"role": "user", "content": specific_questions_prompt}]
-    questions_response = send_message(model, questions_context, specific_questions_prompt, suppress_output=True, config=config)
-    spinner.stop()
+    try:
+        questions_response = await run_blocking(send_message, model, questions_context, specific_questions_prompt, suppress_output=True, config=config, token=token, profile=generation_profile("clarifying_questions", lines=5))
+    finally:
+        spinner.stop()
     
     prompts = []
     for line in questions_response.strip().split('\n'):
@@ -28,47 +39,53 @@ def start_deep_research(model, original_request, config):
         if clean_prompt and len(clean_prompt) > 10:
             prompts.append(clean_prompt)
     
+    events.emit("clarifying_questions", questions=prompts[:5])
     console.print("\n[green]To better focus the research on your request, please clarify:[/green]")
     for prompt in prompts[:5]:
         console.print(f"• {prompt}")
     
-    console.print("[green]Enter your response:[/green] ", end="")
-    additional_details = input().strip()
-    return additional_details
+    additional_details = await ask("[green]Enter your response:[/green] ")
+    return additional_details.strip()
 
-def perform_deep_research_step(model, original_request, additional_details, current_summary, previous_queries, step, total_steps, config):
-    console.print(f"\n[green]Research Step {step} of {total_steps}[/green]\n")
+async def generate_research_aspects(model, original_request, additional_details, total_steps, config, token=None):
+    if token is not None:
+        token.check()
+    spinner = FancySpinner("Generating research aspects")
+    spinner.start()
+    
+    aspects_prompt = (
+        f"For the topic: '{original_request}'\n"
+        f"Additional details: '{additional_details}'\n\n"
+        f"Generate {total_steps} distinct research aspects to explore sequentially.\n"
+        f"Each aspect should cover ONE specific dimension of the topic.\n"
+        f"Number each aspect and make them progressively more specific, starting with fundamental concepts.\n"
+        f"Return only the numbered list without explanations."
+    )
     
-    if not hasattr(perform_deep_research_step, 'aspects'):
-        spinner = FancySpinner("Generating research aspects\n")
-        spinner.start()
-        
-        aspects_prompt = (
-            f"For the topic: '{original_request}'\n"
-            f"Additional details: '{additional_details}'\n\n"
-            f"Generate {total_steps} distinct research aspects to explore sequentially.\n"
-            f"Each aspect should cover ONE specific dimension of the topic.\n"
-            f"Number each aspect and make them progressively more specific, starting with fundamental concepts.\n"
-            f"Return only the numbered list without explanations."
-        )
-        
-        aspects_context = [{"role": "user", "content": aspects_prompt}]
-        aspects_response = send_message(model, aspects_context, aspects_prompt, suppress_output=True, config=config)
-        
-        perform_deep_research_step.aspects = []
-        for line in aspects_response.strip().split('\n'):
-            line = line.strip()
-            clean_aspect = re.sub(r'^\d+\.?\s+', '', line)
-            if clean_aspect and len(clean_aspect) > 3:
-                perform_deep_research_step.aspects.append(clean_aspect)
-        
+    aspects_context = [{"role": "user", "content": aspects_prompt}]
+    try:
+        aspects_response = await run_blocking(send_message, model, aspects_context, aspects_prompt, suppress_output=True, config=config, token=token, profile=generation_profile("research_aspects", lines=total_steps + 1))
+    finally:
         spinner.stop()
     
-    if len(perform_deep_research_step.aspects) < step:
+    aspects = []
+    for line in aspects_response.strip().split('\n'):
+        line = line.strip()
+        clean_aspect = re.sub(r'^\d+\.?\s+', '', line)
+        if clean_aspect and len(clean_aspect) > 3:
+            aspects.append(clean_aspect)
+    return aspects
+
+async def perform_deep_research_step(model, original_request, additional_details, current_summary, previous_queries, aspects, step, total_steps, config, token=None, dedup=None):
+    console.print(f"\n[green]Research Step {step} of {total_steps}[/green]\n")
+    
+    if len(aspects) < step:
         current_aspect = f"Additional details and specific information about {original_request}"
     else:
-        current_aspect = perform_deep_research_step.aspects[step-1]
+        current_aspect = aspects[step-1]
     
+    if token is not None:
+        token.check()
     spinner = FancySpinner("Generating targeted search query")
     spinner.start()
     
@@ -105,18 +122,27 @@ def perform_deep_research_step(model, original_request, additional_details, curr
     )
     
     search_context = [{"role": "user", "content": search_prompt}]
-    gen_query_response = send_message(model, search_context, search_prompt, suppress_output=True, config=config)
-    gen_query = gen_query_response.strip().splitlines()[0].strip()
-    spinner.stop()
+    try:
+        gen_query_response = await run_blocking(send_message, model, search_context, search_prompt, suppress_output=True, config=config, token=token, profile="research_query")
+    finally:
+        spinner.stop()
+    gen_query_lines = gen_query_response.strip().splitlines()
+    gen_query = gen_query_lines[0].strip() if gen_query_lines else current_aspect
     
+    events.emit("research_step", step=step, total=total_steps, aspect=current_aspect, query=gen_query)
     console.print(f"[green]Researching aspect:[/green] {current_aspect}")
     console.print(f"[green]Generated search query:[/green] {gen_query}")
     
-    search_result = search_duckduckgo(
+    search_result = await search_duckduckgo(
         gen_query,
         max_results=config.get("search_count", 2),
-        search_amount=config.get("search_amount", 500)
+        token=token,
+        config=config,
+        focus=current_aspect,
+        dedup=dedup
     )
+    if not search_result:
+        search_result = "No search results were available for this step."
     
     urls = []
     for line in search_result.splitlines():
@@ -141,15 +167,19 @@ def perform_deep_research_step(model, original_request, additional_details, curr
         f"Summarize NEW information about {current_aspect} that contributes to understanding the topic. Be concise but thorough."
     )
     
+    if token is not None:
+        token.check()
     spinner = FancySpinner("Analyzing")
     spinner.start()
     summary_context = [{"role": "user", "content": summary_prompt}]
-    summary_response = send_message(model, summary_context, summary_prompt, suppress_output=True, config=config)
-    spinner.stop()
+    try:
+        summary_response = await run_blocking(send_message, model, summary_context, summary_prompt, suppress_output=True, config=config, token=token, profile="research_summary")
+    finally:
+        spinner.stop()
     
     return summary_response.strip(), gen_query
 
-def compile_research_results(model, original_request, additional_details, all_research, config):
+async def compile_research_results(model, original_request, additional_details, all_research, config, token=None):
     model_max_context = config.get("context_size", 2048)
     
     instructions_length = len(
@@ -191,9 +221,11 @@ def compile_research_results(model, original_request, additional_details, all_re
         f"Format your response as a polished, publication-ready document."
     )
     
+    if token is not None:
+        token.check()
     console.print("\n[green]Compiling final answer...[/green]\n")
     
     final_context = [{"role": "user", "content": final_prompt}]
-    final_answer = send_message(model, final_context, final_prompt, suppress_output=False, config=config)
+    final_answer = await run_blocking(send_message, model, final_context, final_prompt, suppress_output=False, config=config, token=token)
     
     return final_answer
\ No newline at end of file
@@ -1,111 +1,355 @@
+import asyncio
 import requests
 import datetime
+import re
 import random
 import time
-from bs4 import BeautifulSoup
-from duckduckgo_search import DDGS
 from rich.console import Console
+from api.lifecycle import CancelToken, Cancelled
+from chat.messaging import send_message
+from chat.profiles import generation_profile
+from tools.dedup import MinHashFilter, DEFAULT_THRESHOLD
+from tools.cache import search_cache, query_key
+from tools.extract import extract_text
+from tools.limiter import search_limiter, search_breaker, is_rate_limit
+from tools.rank import select_passages, estimate_tokens
+from tools.fetch import PageReader, conditional_headers, freshness, response_validators, refuse_private_redirects, POOL_WORDS
+from ui.events import events
+from utils.aio import run_blocking
 from utils.spinners import FancySpinner
 
 console = Console()
-OLLAMA_API_BASE = "http://localhost:11434"
+PAGE_TIMEOUT = (5, 5)
+PAGE_ACCEPT = "text/html,application/xhtml+xml,text/plain;q=0.9,*/*;q=0.1"
+FETCH_WORKERS = 4
+FETCH_DEADLINE = 8
+SEARCH_TOKENS = 800
+SPECULATIVE_WORDS = 12
+RRF_K = 60
+FANOUT_DEPTH = 2
 
-def search_duckduckgo(query, max_results=2, search_amount=500):
-    delay = random.uniform(0.5, 1.5)
-    time.sleep(delay)
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:90.0) Gecko/20100101 Firefox/90.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
+]
+
+def fetch_page_text(link, original_snippet, search_amount, token=None, backend="auto", public_only=False):
+    started = time.monotonic()
+    try:
+        cached, fresh = search_cache.lookup("pages", link)
+        stale = cached is not None and not fresh
+        if cached is not None and not (cached["complete"] or cached["words"] >= search_amount):
+            cached = None
+        if cached is not None and fresh:
+            events.emit("page_fetched", url=link, ok=True, cached=True, seconds=round(time.monotonic() - started, 3))
+            return " ".join(cached["text"].split()[:search_amount])
+        page_headers = {"User-Agent": random.choice(USER_AGENTS), "Accept": PAGE_ACCEPT}
+        if cached is not None:
+            page_headers.update(conditional_headers(cached.get("validators", {})))
+        timeout = tuple(token.limit(t) for t in PAGE_TIMEOUT) if token is not None else PAGE_TIMEOUT
+        hooks = {"response": refuse_private_redirects} if public_only else None
+        page = requests.get(link, timeout=timeout, headers=page_headers, stream=True, hooks=hooks)
+        if token is not None:
+            token.register(page)
+        reader = PageReader(page, search_amount)
+        snippet_text = original_snippet
+        revalidated = False
+        try:
+            if page.status_code == 304 and cached is not None:
+                cached["expires"] = freshness(page.headers)[1]
+                cached.setdefault("validators", {}).update(response_validators(page.headers))
+                search_cache.revalidated("pages", link, cached)
+                snippet_text = " ".join(cached["text"].split()[:search_amount])
+                revalidated = True
+            elif page.ok and reader.acceptable():
+                if stale:
+                    search_cache.record("pages", "misses")
+                text = extract_text(reader.read(), search_amount, backend=backend)
+                cacheable, expires = freshness(page.headers)
+                validators = response_validators(page.headers)
+                if text:
+                    snippet_text = text
+                if text and cacheable and (validators or expires is None or expires > time.time()):
+                    search_cache.put("pages", link, {
+                        "text": text,
+                        "words": search_amount,
+                        "complete": len(text.split()) < search_amount and not reader.truncated,
+                        "validators": validators,
+                        "expires": expires
+                    })
+        finally:
+            if token is not None:
+                token.release(page)
+            else:
+                page.close()
+        events.emit(
+            "page_fetched",
+            url=link,
+            ok=revalidated or (page.ok and reader.acceptable()),
+            cached=revalidated,
+            revalidated=revalidated,
+            content_type=reader.content_type,
+            bytes=reader.bytes_read,
+            truncated=reader.truncated,
+            seconds=round(time.monotonic() - started, 3)
+        )
+        return snippet_text
+    except Cancelled:
+        raise
+    except Exception as e:
+        if token is not None:
+            token.check()
+        events.emit("page_fetched", url=link, ok=False, error=str(e), seconds=round(time.monotonic() - started, 3))
+        return original_snippet
+
+async def fetch_pages(results, search_amount, workers=FETCH_WORKERS, deadline=FETCH_DEADLINE, token=None, backend="auto"):
+    limit = asyncio.Semaphore(max(1, workers))
+    fetch_token = token.child(timeout=deadline) if token is not None else CancelToken(timeout=deadline)
+
+    async def fetch(result):
+        async with limit:
+            fetch_token.check()
+            return await run_blocking(
+                fetch_page_text,
+                result.get("href", ""),
+                result.get("body", "No snippet available"),
+                search_amount,
+                fetch_token,
+                backend
+            )
+
+    tasks = [asyncio.ensure_future(fetch(result)) for result in results]
+    try:
+        await asyncio.wait(tasks, timeout=deadline)
+    finally:
+        fetch_token.cancel()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        fetch_token.close()
+    if token is not None:
+        token.check()
+
+    snippets = []
+    for result, task in zip(results, tasks):
+        if not task.cancelled() and task.exception() is None:
+            snippets.append(task.result())
+            continue
+        events.emit("page_fetched", url=result.get("href", ""), ok=False, error="deadline exceeded", seconds=deadline)
+        snippets.append(result.get("body", "No snippet available"))
+    return snippets
+
+async def search_backend(query, max_results):
+    from duckduckgo_search import DDGS
+    headers = {"User-Agent": random.choice(USER_AGENTS)}
+    ddgs = DDGS(headers=headers)
+    try:
+        results = await run_blocking(ddgs.text, query, max_results=max_results)
+    except Exception as e:
+        if is_rate_limit(e):
+            backoff = search_limiter.throttled()
+            events.emit("search_rate_limited", query=query, backoff=backoff, limiter=search_limiter.describe())
+        search_breaker.failure()
+        raise
+    search_limiter.success()
+    search_breaker.success()
+    return results
+
+async def lookup_results(query, max_results=2, token=None):
+    key = query_key(query, max_results)
+    results = await run_blocking(search_cache.get, "queries", key)
+    cached = results is not None
+    if not cached and not search_breaker.allow():
+        console.print(f"[yellow]Web search is paused after repeated failures ({search_breaker.describe()}); answering without search results.[/yellow]")
+        events.emit("search_skipped", query=query, reason="circuit open", retry_in=round(search_breaker.retry_in(), 1))
+        return None
     
-    search_result = ""
     spinner = FancySpinner(f"Searching for '{query}'")
     spinner.start()
+    events.emit("search_query", query=query)
+    started = time.monotonic()
     
-    user_agents = [
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15",
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:90.0) Gecko/20100101 Firefox/90.0",
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36",
-        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
-    ]
-    
-    user_agent = random.choice(user_agents)
+    try:
+        if not cached:
+            delay = search_limiter.reserve()
+            if delay > 0:
+                spinner.update(f"Waiting {delay:.1f}s for the search rate limit")
+                events.emit("search_throttled", query=query, delay=round(delay, 2), limiter=search_limiter.describe())
+                await asyncio.sleep(delay)
+                spinner.update(f"Searching for '{query}'")
+            results = await search_backend(query, max_results)
+            if results:
+                await run_blocking(search_cache.put, "queries", key, results)
+        if token is not None:
+            token.check()
+        events.emit("search_results", query=query, urls=[result.get("href", "") for result in results or []], cached=cached, seconds=round(time.monotonic() - started, 3))
+        return results or []
+    except Cancelled:
+        raise
+    except Exception as e:
+        events.emit("error", stage="search", message=str(e))
+        console.print(f"[yellow]Web search failed ({e}); answering without search results.[/yellow]")
+        return None
+    finally:
+        if not cached:
+            search_breaker.release()
+        spinner.stop()
+
+async def fetch_result_pages(results, token=None, config=None, prefetched=None):
+    config = config or {}
+    pages = dict(prefetched or {})
+    missing = [result for result in results if result.get("href", "") not in pages]
+    if missing:
+        snippets = await fetch_pages(
+            missing,
+            POOL_WORDS,
+            workers=config.get("fetch_workers", FETCH_WORKERS),
+            deadline=config.get("fetch_deadline", FETCH_DEADLINE),
+            token=token,
+            backend=config.get("html_backend", "auto")
+        )
+        pages.update((result.get("href", ""), snippet) for result, snippet in zip(missing, snippets))
+    return pages
+
+async def build_search_context(results, query, token=None, config=None, focus=None, dedup=None, prefetched=None):
+    config = config or {}
+    if dedup is None:
+        dedup = MinHashFilter(config.get("dedup_threshold", DEFAULT_THRESHOLD))
+    if not results:
+        return "No results found."
     
+    spinner = FancySpinner(f"Fetching content from {len(results)} result(s)")
+    spinner.start()
     try:
-        headers = {"User-Agent": user_agent}
-        ddgs = DDGS(headers=headers)
-        results = ddgs.text(query, max_results=max_results)
-        if results and len(results) > 0:
-            formatted_results = []
-            for i, result in enumerate(results, start=1):
-                title = result.get("title", "No title")
-                original_snippet = result.get("body", "No snippet available")
-                link = result.get("href", "")
-                
-                spinner.update(f"Fetching content from {title}")
-                snippet_text = ""
-                try:
-                    page_headers = {"User-Agent": random.choice(user_agents)}
-                    page = requests.get(link, timeout=5, headers=page_headers)
-                    if page.ok:
-                        soup = BeautifulSoup(page.text, "html.parser")
-                        for script in soup(["script", "style"]):
-                            script.decompose()
-                        text_content = soup.get_text(separator=" ")
-                        words = text_content.split()
-                        snippet_text = " ".join(words[:search_amount])
-                    else:
-                        snippet_text = original_snippet
-                except Exception as ex:
-                    snippet_text = original_snippet
-
-                formatted_results.append(
-                    f"Result {i}: Title: {title} Snippet: {snippet_text} Link: {link}"
-                )
-            search_result = "\n".join(formatted_results)
-        else:
-            search_result = "No results found."
+        pages = await fetch_result_pages(results, token=token, config=config, prefetched=prefetched)
+        snippets = [pages[result.get("href", "")] for result in results]
+        budget = config.get("search_tokens", SEARCH_TOKENS)
+        dropped = dedup.dropped
+        passages = select_passages(snippets, f"{query} {focus or ''}", budget, dedup=dedup)
+        events.emit(
+            "passages",
+            query=query,
+            kept=sum(len(chosen) for chosen in passages),
+            duplicates=dedup.dropped - dropped,
+            tokens=sum(estimate_tokens(passage) for chosen in passages for passage in chosen),
+            budget=budget
+        )
+        formatted_results = []
+        for i, (result, chosen) in enumerate(zip(results, passages), start=1):
+            title = result.get("title", "No title")
+            link = result.get("href", "")
+            snippet_text = " ... ".join(chosen) or result.get("body", "No snippet available")
+            formatted_results.append(
+                f"Result {i}: Title: {title} Snippet: {snippet_text} Link: {link}"
+            )
+        return "\n".join(formatted_results)
+    except Cancelled:
+        raise
     except Exception as e:
-        search_result = f"Error during search: {str(e)}"
+        events.emit("error", stage="search", message=str(e))
+        console.print(f"[yellow]Web search failed ({e}); answering without search results.[/yellow]")
+        return ""
     finally:
         spinner.stop()
-    return search_result
 
-def generate_search_query(user_prompt, model, config):
+async def search_duckduckgo(query, max_results=2, token=None, config=None, focus=None, dedup=None):
+    results = await lookup_results(query, max_results, token=token)
+    if results is None:
+        return ""
+    return await build_search_context(results, query, token=token, config=config, focus=focus, dedup=dedup)
+
+def fuse_results(result_lists, limit, k=RRF_K):
+    result_lists = [results for results in result_lists if results is not None]
+    if not result_lists:
+        return None
+    scores = {}
+    first_seen = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            link = result.get("href", "")
+            if link not in first_seen:
+                first_seen[link] = result
+            scores[link] = scores.get(link, 0.0) + 1.0 / (k + rank)
+    order = sorted(first_seen, key=lambda link: scores[link], reverse=True)
+    return [first_seen[link] for link in order[:limit]]
+
+async def search_all(queries, max_results, token=None):
+    return list(await asyncio.gather(*(lookup_results(query, max_results, token=token) for query in queries)))
+
+async def fan_out_search(queries, max_results, token=None):
+    depth = max_results if len(queries) == 1 else max_results * FANOUT_DEPTH
+    return fuse_results(await search_all(queries, depth, token=token), max_results)
+
+def parse_search_queries(content, count, fallback):
+    queries = []
+    seen = set()
+    for line in content.splitlines():
+        line = re.sub(r"^\s*(?:\d+[.)]|[-*\u2022])\s*", "", line.replace("<think>", "")).strip().strip('"').strip()
+        key = query_key(line, 0)
+        if not line or key in seen:
+            continue
+        seen.add(key)
+        queries.append(line)
+        if len(queries) >= count:
+            break
+    return queries or [fallback]
+
+def speculative_query(text, max_words=SPECULATIVE_WORDS):
+    return " ".join(re.sub(r"[^\w\s'-]", " ", text).split()[:max_words])
+
+def generate_search_query(user_prompt, model, config, token=None, count=1):
     current_date = datetime.datetime.now().strftime("%Y-%m-%d")
-    search_prompt = (
-        f"Today is {current_date}. From the user's inquiry below, create a short search query.\n"
-        f"Make it different from the original inquiry.\n"
-        f"Do not use any symbols or punctuation.\n"
-        f"User inquiry: {user_prompt} Search Query:"
-    )
+    if count > 1:
+        search_prompt = (
+            f"Today is {current_date}. From the user's inquiry below, create {count} different short search queries, one per line.\n"
+            f"Each query should use different wording or cover a different angle of the inquiry.\n"
+            f"Do not number the queries and do not use any symbols or punctuation.\n"
+            f"User inquiry: {user_prompt} Search Queries:"
+        )
+    else:
+        search_prompt = (
+            f"Today is {current_date}. From the user's inquiry below, create a short search query.\n"
+            f"Make it different from the original inquiry.\n"
+            f"Do not use any symbols or punctuation.\n"
+            f"User inquiry: {user_prompt} Search Query:"
+        )
     search_prompt = " ".join(search_prompt.split())
     
-    spinner = FancySpinner("Generating search query")
+    spinner = FancySpinner("Generating search quer" + ("ies" if count > 1 else "y"))
     spinner.start()
     
+    call = token.child(timeout=config.get("query_timeout", 60)) if token else CancelToken(timeout=config.get("query_timeout", 60))
     try:
-        response = requests.post(
-            f"{OLLAMA_API_BASE}/api/chat",
-            json={
-                "model": model,
-                "messages": [{"role": "user", "content": search_prompt}],
-                "stream": False,
-                "options": {
-                    "num_ctx": config.get("context_size", 2048),
-                    "top_p": config.get("top_p", 0.9),
-                    "top_k": config.get("top_k", 40),
-                    "temperature": config.get("temperature", 0.7)
-                }
-            }
-        )
-        if response.ok:
-            data = response.json()
-            search_query = data.get("message", {}).get("content", "").strip().splitlines()[0]
-            return search_query
-        else:
-            console.print("[green]Error: Received non-OK response from API while generating search query.[/green]")
+        content = send_message(
+            model,
+            [{"role": "user", "content": search_prompt}],
+            search_prompt,
+            suppress_output=True,
+            config=config,
+            token=call,
+            profile=generation_profile("search_queries" if count > 1 else "search_query", lines=count)
+        ).strip()
+        if not content:
             return user_prompt
+        if count > 1:
+            return content
+        return content.splitlines()[0]
+    except Cancelled:
+        if token is not None:
+            token.check()
+        events.emit("error", stage="query_generation", message="timed out, using the original inquiry")
+        console.print("[green]Search query generation timed out, using the original inquiry.[/green]")
+        return user_prompt
     except Exception as e:
+        if token is not None:
+            token.check()
+        events.emit("error", stage="query_generation", message=str(e))
         console.print(f"[green]Error generating search query: {e}[/green]")
         return user_prompt
     finally:
+        call.close()
         spinner.stop()
\ No newline at end of file
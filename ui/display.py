@@ -2,6 +2,8 @@ import os
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from ui.events import events
+from tools.limiter import search_limiter, search_breaker
 
 console = Console()
 
@@ -40,18 +42,32 @@ def display_settings(config):
     deep_research_state = "[green]enabled[/green]" if config.get("deep_research", False) else "[red]disabled[/red]"
     search_state = "[green]enabled[/green]" if config.get("search", True) else "[red]disabled[/red]"
     search_mode = f"[yellow]{config.get('search_mode', 'auto')}[/yellow]"
+    markdown_state = "[green]enabled[/green]" if config.get("render_markdown", True) else "[red]disabled[/red]"
     
     settings_table = Table(show_header=False, box=None, padding=(0,1,0,1))
     settings_table.add_column("Setting", style="white")
     settings_table.add_column("Value", style="green")
     
+    settings_table.add_row("Helper Model:", f"[yellow]{config.get('helper_model') or 'same as chat model'}[/yellow]")
     settings_table.add_row("History:", history_state)
     settings_table.add_row("Deep research:", deep_research_state)
     settings_table.add_row("Search:", search_state)
     settings_table.add_row("Deep research amount:", f"[yellow]{config.get('deep_research_amount', 4)}[/yellow]")
     settings_table.add_row("Search Mode:", search_mode)
+    settings_table.add_row("Search Gate:", ("[green]enabled[/green]" + (" with model probe" if config.get("gate_probe", False) else "")) if config.get("search_gate", True) else "[red]disabled[/red]")
+    settings_table.add_row("Speculative Search:", f"[yellow]{config.get('speculative_search', 'merge')}[/yellow]")
+    settings_table.add_row("Search Queries:", f"[yellow]{config.get('search_queries', 1)}[/yellow] per question")
     settings_table.add_row("Search Count:", f"[yellow]{config.get('search_count', 2)}[/yellow]")
-    settings_table.add_row("Search Amount:", f"[yellow]{config.get('search_amount', 500)}[/yellow] words per result")
+    settings_table.add_row("Search Amount:", f"[yellow]{config.get('search_amount', 500)}[/yellow] words per page read by the model")
+    settings_table.add_row("Search Tokens:", f"[yellow]{config.get('search_tokens', 800)}[/yellow] tokens of passages")
+    settings_table.add_row("Page Fetch:", f"[yellow]{config.get('fetch_workers', 4)}[/yellow] workers, [yellow]{config.get('fetch_deadline', 8)}s[/yellow] deadline")
+    settings_table.add_row("Search Backend:", f"[yellow]{search_limiter.describe()}[/yellow], circuit [yellow]{search_breaker.describe()}[/yellow]")
+    settings_table.add_row("Search Cache:", f"[green]enabled[/green], [yellow]{config.get('cache_ttl', 24)}h[/yellow] TTL" if config.get("search_cache", True) else "[red]disabled[/red]")
+    settings_table.add_row("Response Cache:", "[green]enabled[/green]" if config.get("response_cache", False) else "[red]disabled[/red]")
+    settings_table.add_row("HTML Parser:", f"[yellow]{config.get('html_backend', 'auto')}[/yellow]")
+    settings_table.add_row("Markdown:", markdown_state)
+    settings_table.add_row("Refresh Rate:", f"[yellow]{config.get('refresh_rate', 15)}[/yellow] fps")
+    settings_table.add_row("Type-ahead:", "[green]enabled[/green]" if config.get("type_ahead", True) else "[red]disabled[/red]")
     settings_table.add_row("Context Size:", f"[yellow]{config.get('context_size', 2048)}[/yellow]")
     settings_table.add_row("Top P:", f"[yellow]{config.get('top_p', 0.9)}[/yellow]")
     settings_table.add_row("Top K:", f"[yellow]{config.get('top_k', 40)}[/yellow]")
@@ -59,5 +75,33 @@ def display_settings(config):
     
     console.print(Panel(settings_table, title="[bold][violet]OLLUMAR[/violet] - Current Settings[/bold]", expand=False))
 
+def display_cache_stats(stats, config):
+    table = Table(show_header=True, header_style="bold green")
+    table.add_column("Layer", style="cyan")
+    table.add_column("Entries", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("Hits / Misses", justify="right")
+    table.add_column("Revalidated", justify="right")
+    table.add_column("Hit Rate", justify="right", style="green")
+    table.add_column("This Session", justify="right")
+    for layer, layer_stats in stats.items():
+        lookups = layer_stats["hits"] + layer_stats["misses"]
+        hit_rate = f"{layer_stats['hits'] / lookups:.0%}" if lookups else "-"
+        table.add_row(
+            layer.capitalize(),
+            str(layer_stats["entries"]),
+            f"{layer_stats['bytes'] / 1024:.0f} KB",
+            f"{layer_stats['hits']} / {layer_stats['misses']}",
+            str(layer_stats["revalidated"]),
+            hit_rate,
+            f"{layer_stats['session_hits']} / {layer_stats['session_misses']}"
+        )
+    state = "[green]enabled[/green]" if config.get("search_cache", True) else "[red]disabled[/red]"
+    responses = "[green]on[/green]" if config.get("response_cache", False) else "[red]off[/red]"
+    title = f"[bold]Search Cache[/bold] ({state}, responses {responses}, TTL {config.get('cache_ttl', 24)}h, limit {config.get('cache_size', 50)} MB)"
+    console.print(Panel(table, title=title, expand=False))
+
 def clear_screen():
+    if events.enabled:
+        return
     os.system("clear")
\ No newline at end of file
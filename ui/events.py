@@ -0,0 +1,27 @@
+import threading
+import time
+from api.ndjson import dumps
+
+class EventStream:
+    def __init__(self):
+        self.stream = None
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.stream is not None
+
+    def enable(self, stream):
+        self.stream = stream
+
+    def emit(self, event, **fields):
+        if self.stream is None:
+            return
+        record = {"event": event, "time": round(time.time(), 3)}
+        record.update(fields)
+        line = dumps(record) + "\n"
+        with self.lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+events = EventStream()
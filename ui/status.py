@@ -0,0 +1,102 @@
+import threading
+import time
+from rich.console import Console, Group
+from rich.live import Live
+from rich.spinner import Spinner
+from rich.text import Text
+
+console = Console()
+
+class StatusBoard:
+    def __init__(self, console, refresh_rate=10):
+        self.console = console
+        self.interval = 1.0 / refresh_rate
+        self.lock = threading.RLock()
+        self.wakeup = threading.Condition(self.lock)
+        self.tasks = {}
+        self.labels = {}
+        self.next_id = 0
+        self.passive = False
+        self.body = None
+        self.live = None
+        self.thread = None
+
+    def add(self, description):
+        with self.lock:
+            task_id = self.next_id
+            self.next_id += 1
+            self.tasks[task_id] = Spinner("dots", text=Text(description.strip(), style="green"))
+            self.labels[task_id] = description.strip()
+            self._ensure_running()
+        return task_id
+
+    def update(self, task_id, description):
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is not None:
+                task.update(text=Text(description.strip(), style="green"))
+                self.labels[task_id] = description.strip()
+
+    def remove(self, task_id):
+        with self.lock:
+            self.tasks.pop(task_id, None)
+            self.labels.pop(task_id, None)
+            self._stop_if_idle()
+
+    def set_body(self, renderable):
+        with self.lock:
+            self.body = renderable
+            if renderable is None:
+                self._stop_if_idle()
+            else:
+                self._ensure_running()
+
+    def set_passive(self, passive):
+        with self.lock:
+            self.passive = passive
+            if passive and self.live is not None:
+                self.live.stop()
+                self.live = None
+            elif not passive and (self.tasks or self.body is not None):
+                self._ensure_running()
+
+    def describe(self):
+        return " | ".join(list(self.labels.values()))
+
+    def refresh(self):
+        with self.lock:
+            if self.live is not None:
+                self.live.refresh()
+
+    def _ensure_running(self):
+        if self.passive:
+            return
+        if self.live is None:
+            self.live = Live(self, console=self.console, auto_refresh=False, transient=True)
+            self.live.start()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._tick, daemon=True)
+            self.thread.start()
+        self.wakeup.notify()
+
+    def _stop_if_idle(self):
+        if self.live is not None and not self.tasks and self.body is None:
+            self.live.stop()
+            self.live = None
+
+    def _tick(self):
+        while True:
+            with self.lock:
+                while self.live is None:
+                    self.wakeup.wait()
+                self.live.refresh()
+            time.sleep(self.interval)
+
+    def __rich__(self):
+        items = list(self.tasks.values())
+        body = self.body
+        if body is not None:
+            items.insert(0, body)
+        return Group(*items)
+
+status_board = StatusBoard(console)
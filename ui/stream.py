@@ -0,0 +1,96 @@
+import sys
+import time
+from ui.status import status_board
+
+SLOW_FRAME_LIMIT = 3
+
+def markdown_block(text):
+    from rich.markdown import Markdown
+    return Markdown(text)
+
+class StreamRenderer:
+    def __init__(self, console, refresh_rate=15, markdown=True, clock=time.monotonic, board=status_board):
+        self.console = console
+        self.board = board
+        self.clock = clock
+        self.interval = 1.0 / max(1, refresh_rate)
+        self.markdown = markdown and console.is_terminal
+        self.parts = []
+        self.tail = ""
+        self.showing = False
+        self.last_frame = 0.0
+        self.slow_frames = 0
+
+    def write(self, text):
+        if not text:
+            return
+        self.parts.append(text)
+        if self.clock() - self.last_frame >= self.interval:
+            self.flush()
+
+    def flush(self):
+        pending = "".join(self.parts)
+        self.parts = []
+        started = self.clock()
+        if self.markdown:
+            self._render_markdown(pending)
+        elif pending:
+            sys.stdout.write(pending)
+            sys.stdout.flush()
+        self.last_frame = self.clock()
+        if self.markdown and self.last_frame - started > self.interval / 2:
+            self.slow_frames += 1
+            if self.slow_frames >= SLOW_FRAME_LIMIT:
+                self._fall_back_to_raw()
+        else:
+            self.slow_frames = 0
+
+    def _render_markdown(self, pending):
+        self.tail += pending
+        complete, self.tail = split_complete_blocks(self.tail)
+        if complete.strip():
+            self.console.print(markdown_block(complete))
+            self.console.print()
+        if self.tail and not self.board.passive:
+            self.board.set_body(markdown_block(self.tail))
+            self.board.refresh()
+            self.showing = True
+        elif self.showing:
+            self._hide_tail()
+
+    def _hide_tail(self):
+        if self.showing:
+            self.board.set_body(None)
+            self.showing = False
+
+    def _fall_back_to_raw(self):
+        self._hide_tail()
+        self.markdown = False
+        if self.tail:
+            sys.stdout.write(self.tail)
+            sys.stdout.flush()
+            self.tail = ""
+
+    def pause(self):
+        self.flush()
+        if self.markdown:
+            self._hide_tail()
+            if self.tail.strip():
+                self.console.print(markdown_block(self.tail))
+            self.tail = ""
+
+    def close(self):
+        self.pause()
+
+def split_complete_blocks(text):
+    in_fence = False
+    cut = 0
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        pos += len(line)
+        stripped = line.strip()
+        if stripped.startswith("```") or stripped.startswith("~~~"):
+            in_fence = not in_fence
+        elif not stripped and not in_fence and line.endswith("\n"):
+            cut = pos
+    return text[:cut], text[cut:]
@@ -9,15 +9,30 @@ def setup_command_completer():
         "/settings",
         "/reset",
         "/change_model", 
+        "/helper_model",
         "/history", 
         "/clear", 
         "/exit", 
         "/toggle_history",
         "/toggle_search", 
         "/toggle_search_mode", 
+        "/search_gate",
+        "/speculative_search",
         "/toggle_deep_research",
+        "/toggle_markdown",
+        "/refresh_rate",
+        "/toggle_type_ahead",
+        "/stop",
         "/search_count", 
         "/search_amount",
+        "/search_tokens",
+        "/search_queries",
+        "/search_status",
+        "/toggle_search_cache",
+        "/toggle_response_cache",
+        "/cache_stats",
+        "/cache_ttl",
+        "/purge_cache",
         "/context_size", 
         "/deep_research_amount",
         "/set_system_prompt", 
@@ -77,17 +92,32 @@ def print_help():
     console.print("  [green]/settings[/green]                       → display current settings")
     console.print("  [green]/reset[/green]                          → reset all settings to default values")
     console.print("  [green]/change_model[/green]                   → go back to model selection")
+    console.print("  [green]/helper_model <name|off>[/green]        → use a small model for search queries, research outlines and summaries")
     console.print("  [green]/history[/green]                        → view saved chat sessions (and load or delete them)")
     console.print("  [green]/clear[/green]                          → clear the current chat")
     console.print("  [green]/exit[/green]                           → exit the chat (session is saved automatically)")
     console.print("  [green]/toggle_history[/green]                 → enable/disable history saving")
     console.print("  [green]/toggle_search[/green]                  → enable/disable internet search in prompts")
-    console.print("  [green]/toggle_search_mode[/green]             → toggle between auto and manual search modes")
+    console.print("  [green]/toggle_search_mode[/green]             → cycle between auto, manual and tools search modes")
+    console.print("  [green]/search_gate <on|off|probe>[/green]     → decide locally whether a message needs a web search (probe also asks the model when unsure)")
+    console.print("  [green]/speculative_search <merge|first|off>[/green] → search the raw question while the search query is generated (default: merge)")
     console.print("  [green]/search_count <number>[/green]          → set number of search results to display (default: 2)")
-    console.print("  [green]/search_amount <number>[/green]         → set number of words to fetch per search result (default: 500)")
+    console.print("  [green]/search_amount <number>[/green]         → set number of words the model gets when it reads a page in tools mode (default: 500)")
+    console.print("  [green]/search_tokens <number>[/green]         → set the token budget for search passages added to the prompt (default: 800)")
+    console.print("  [green]/search_queries <number>[/green]        → generate several search queries and fuse their results (1-5, default: 1)")
+    console.print("  [green]/search_status[/green]                   → show the search rate limiter and circuit breaker state")
+    console.print("  [green]/toggle_search_cache[/green]             → enable/disable the on-disk cache of search results and pages")
+    console.print("  [green]/cache_stats[/green]                     → show search cache size and hit/miss statistics")
+    console.print("  [green]/cache_ttl <hours>[/green]               → set how long cached search results stay fresh (default: 24)")
+    console.print("  [green]/toggle_response_cache[/green]           → enable/disable caching of repeated background model calls")
+    console.print("  [green]/purge_cache \\[queries|pages|responses|expired][/green] → delete cached search results and model responses (all by default)")
     console.print("  [green]/context_size <number>[/green]          → set the model context length (num_ctx) to use in requests (default: 2048)")
     console.print("  [green]/toggle_deep_research[/green]           → enable/disable deep research mode")
     console.print("  [green]/deep_research_amount <number>[/green]  → set the number of deep research iterations (default: 4)")
+    console.print("  [green]/toggle_markdown[/green]                 → enable/disable Markdown rendering of streamed answers")
+    console.print("  [green]/refresh_rate <number>[/green]          → set streamed output frames per second (default: 15)")
+    console.print("  [green]/toggle_type_ahead[/green]               → allow typing and queueing the next message while a response streams")
+    console.print("  [green]/stop[/green]                           → interrupt the response that is currently streaming")
     console.print("  [green]/set_system_prompt <text>[/green]       → set the system prompt for the conversation (default: 'You are a helpful assistant.')")
     console.print("  [green]/set_top_p <number>[/green]             → set the top_p sampling parameter (0.0-1.0) (default: 0.9)")
     console.print("  [green]/set_top_k <number>[/green]             → set the top_k sampling parameter (default: 40)")